@@ -1,25 +1,39 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, g
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, g, Response, abort
 import json
 import time
 import os
 import threading
+import queue
 import logging
+import tempfile
+from collections import namedtuple
+from concurrent.futures import Future
 from datetime import datetime
 import livekit
 import jwt
-import pandas as pd
 from werkzeug.utils import secure_filename
 import uuid
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from models import db, User, Organization, UserSession
+from laser_buffer import LaserRingBuffer
+from lod import select_level
+from uploads import UploadJobs, UploadQueueFull, ChunkedUploads, UploadOffsetMismatch
+from datasets import DatasetStore
+from state_backend import create_state_backend, InMemoryStateBackend
+from deck_store import create_deck_store, MemoryDeckStore, SQLDeckStore, PayloadCache
+from passwords import PasswordHasher, PasswordHasherBusy
+from provisioning import read_user_rows, ProvisioningJobs, ProvisioningQueueFull
+from log_pipeline import configure_logging, init_request_logging, parse_sample_rates, RouteSampler
+from rooms import RoomRegistry, RoomLimitReached, RoomsUnavailable
 from auth import (
-    login_required, admin_required, standard_or_admin_required,
-    create_user_session, destroy_user_session, init_auth
+    login_required, admin_required, standard_or_admin_required, viewer_required,
+    create_user_session, destroy_user_session, init_auth, session_cache, session_sweeper,
+    issue_viewer_ticket
 )
 
-# Configure detailed logging
-logging.basicConfig(level=logging.INFO)
+# Logging goes through a queue to a listener thread (see log_pipeline.py); LOG_FORMAT=json for JSON lines
+configure_logging(os.environ.get('LOG_LEVEL', 'INFO'), json_lines=os.environ.get('LOG_FORMAT') == 'json')
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -33,227 +47,528 @@ if database_url and database_url.startswith('postgres://'):
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'postgresql://localhost/claude_maze'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Password hashing runs in a process pool; see passwords.py
+app.config['PASSWORD_POOL_SIZE'] = int(os.environ.get('PASSWORD_POOL_SIZE', 2))
+app.config['PASSWORD_QUEUE_DEPTH'] = int(os.environ.get('PASSWORD_QUEUE_DEPTH', 32))  # Logins hashing at once before new ones get a 503
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD')  # e.g. 'scrypt' or 'pbkdf2:sha256:600000'; older hashes are upgraded at login
+app.config['BULK_USERS_MAX_ROWS'] = int(os.environ.get('BULK_USERS_MAX_ROWS', 5000))  # Users one /api/users/bulk request may create
+app.config['BULK_USERS_QUEUE_DEPTH'] = int(os.environ.get('BULK_USERS_QUEUE_DEPTH', 4))  # Imports queued or running before new ones get a 503
+
+# Share of requests per endpoint that get an access log line; polled endpoints are sampled.
+# LOG_SAMPLE_RATES=endpoint=rate,... overrides, e.g. 'current_slide=1,get_state=0'
+app.config['LOG_SAMPLE_RATES'] = dict({
+    endpoint: 0.01 for endpoint in (
+        'current_slide', 'get_state', 'get_slides', 'get_slide_manifest', 'get_slide',
+        'get_laser_points', 'add_laser_point', 'add_laser_batch', 'get_video_state', 'static'
+    )
+}, **parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES')))
+
 # Initialize extensions
 db.init_app(app)
 migrate = Migrate(app, db)
 init_auth(app)
+init_request_logging(app, RouteSampler(app.config['LOG_SAMPLE_RATES']))
+password_hasher = PasswordHasher(
+    pool_size=app.config['PASSWORD_POOL_SIZE'],
+    queue_depth=app.config['PASSWORD_QUEUE_DEPTH'],
+    method=app.config['PASSWORD_HASH_METHOD']
+)
+provisioning_jobs = ProvisioningJobs(app, password_hasher, queue_depth=app.config['BULK_USERS_QUEUE_DEPTH'])
 
 # Upload configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv', 'json', 'xlsx', 'xls'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size (single-request uploads and chunks)
+app.config['UPLOAD_CHUNK_SIZE'] = 8 * 1024 * 1024  # Largest chunk of a chunked upload
+app.config['CHUNKED_UPLOAD_MAX_BYTES'] = int(os.environ.get('CHUNKED_UPLOAD_MAX_BYTES', 1024 * 1024 * 1024))  # Largest chunked upload
+app.config['UPLOAD_POOL_SIZE'] = int(os.environ.get('UPLOAD_POOL_SIZE', 2))  # Processes parsing uploads
+app.config['UPLOAD_QUEUE_DEPTH'] = int(os.environ.get('UPLOAD_QUEUE_DEPTH', 8))  # Uploads in flight before new ones are refused
+app.config['DATASET_STORE_PATH'] = os.environ.get('DATASET_STORE_PATH', 'dataset_store')  # Processed upload data, by content hash
 
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Server-sent event stream configuration
+SSE_HEARTBEAT_SECONDS = 15  # Keep-alive interval (proxies drop idle connections; clients treat silence as a dead stream)
+SSE_MAX_STREAM_SECONDS = 300  # Recycle streams so worker threads are not held forever
+
+# Navigation engine configuration
+COMMAND_TIMEOUT_SECONDS = 5  # Longest a request waits for the writer to apply its command
+
+# Laser ingestion configuration
+MAX_LASER_BATCH = 512  # Most points accepted in one batch request
+LASER_STREAM_MIN_INTERVAL = 0.05  # Coalesce laser stream events to at most ~20 per second
+
+# Presentation state backend: 'memory' (one worker only), 'sqlite' (shared by every worker on the host)
+# or 'postgres' (shared by every node through the app database and LISTEN/NOTIFY)
+app.config['STATE_BACKEND'] = os.environ.get('STATE_BACKEND', 'memory')
+app.config['STATE_DB_PATH'] = os.environ.get('STATE_DB_PATH', os.path.join(tempfile.gettempdir(), 'claude_maze_state.db'))
+app.config['STATE_NOTIFY_CHANNEL'] = os.environ.get('STATE_NOTIFY_CHANNEL', 'presentation_state')
+
+# Presentation rooms (/api/rooms/<presentation_id>/...), one per organization and presentation id
+app.config['ROOM_LIMIT'] = int(os.environ.get('ROOM_LIMIT', 1000))
+app.config['ROOM_IDLE_TIMEOUT'] = int(os.environ.get('ROOM_IDLE_TIMEOUT', 1800))  # Seconds before an unused room is closed
+# Room state lives in the serving process, so rooms are only offered when a single worker serves everything
+app.config['ROOMS_ENABLED'] = app.config['STATE_BACKEND'] == 'memory'
+
+# Decks: 'database' persists slides in the app database (data loaded on first use), 'memory' keeps them in the process
+app.config['DECK_STORE'] = os.environ.get('DECK_STORE', 'database')
+app.config['DECK_STORE_FALLBACK'] = os.environ.get('DECK_STORE_FALLBACK') == '1'  # Keep decks in memory if the database is unreachable, instead of failing
+app.config['DECK_CACHE_BYTES'] = int(os.environ.get('DECK_CACHE_BYTES', 64 * 1024 * 1024))  # Slide data kept in memory, all decks together
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def conditional_json(etag, body):
+    """Answer a matching If-None-Match with a bodyless 304, otherwise send the pre-encoded JSON body"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def client_slide(slide):
+    """Copy of a slide as clients get it: the level-of-detail pyramid is summarized, not sent"""
+    slide = dict(slide)
+    lod = slide.get('lod')
+    if lod:
+        slide['lod'] = {
+            'points': lod['points'],
+            'default_width': lod['default_width'],
+            'widths': [level['width'] for level in lod['levels'] if level['width'] is not None]
+        }
+    return slide
+
+# Immutable view of the slide state at one revision, with the API responses already encoded
+SlideSnapshot = namedtuple('SlideSnapshot', [
+    'revision', 'etag', 'slide_json', 'manifest_json', 'current_index', 'total'
+])
+
 class SlideController:
-    def __init__(self):
+    def __init__(self, backend, deck=None):
+        self.backend = backend  # Where state is persisted/shared; see state_backend.py
+        self.store_revision = None  # Backend navigation revision the local slide state matches
+        self.last_access = time.monotonic()  # For idle room eviction
         self.current_slide = 0
         self.current_sub_slide = 0
-        self.lock = threading.Lock()
-        self.laser_points = []  # Store active laser points
+        self.lock = threading.Lock()  # Guards laser and video state
+        self.commands = queue.Queue()  # Slide commands, applied in order by the writer thread
+        self._writer = None
+        self._writer_start_lock = threading.Lock()
+        self.revision = 0  # Bumped on every navigation, sub-slide or deck change
+        self.epoch = uuid.uuid4().hex[:8]  # Keeps ETags from matching across restarts
+        self.changed = threading.Condition()  # Wakes slide stream listeners
+        self.snapshot = None  # Latest SlideSnapshot, replaced (never mutated) by writers
+        self._manifest_json = None  # Encoded per-slide summaries, rebuilt only when the deck changes
+        self.slide_index = {}  # Slide id -> position in the deck
+        self._slide_json = []  # Encoded slides, by position
+        self.laser_points = LaserRingBuffer(capacity=2048, max_age=5.0)  # Points from the last 5 seconds
         self.laser_active = False
         self.last_laser_update = time.time()
+        self.laser_generation = 0  # Bumped when points are cleared, so delta clients drop their trails
+        self.laser_changed = threading.Condition(self.lock)  # Wakes laser stream listeners
 
         # Video streaming state
+        self.video_revision = 0  # Backend revision of the video state below
         self.video_active = False
         self.video_url = ""
         self.video_type = "none"  # none, youtube, vimeo, twitch, webcam, jitsi
         self.webcam_room_id = ""
 
-        logger.info(f"🔧 SlideController initialized - starting at slide {self.current_slide}")
-        self.slides = [
-            {
-                'id': 'line_chart',
-                'title': 'Line Chart',
-                'chart_type': 'line',
-                'data': {
-                    'xAxis': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-                    'series': [820, 932, 901, 934, 1290, 1330, 1320]
-                }
-            },
-            {
-                'id': 'bar_chart',
-                'title': 'Bar Chart',
-                'chart_type': 'bar',
-                'data': {
-                    'xAxis': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-                    'series': [120, 200, 150, 80, 70, 110]
-                }
-            },
-            {
-                'id': 'pie_chart',
-                'title': 'Pie Chart',
-                'chart_type': 'pie',
-                'data': [
-                    {'value': 1048, 'name': 'Search Engine'},
-                    {'value': 735, 'name': 'Direct'},
-                    {'value': 580, 'name': 'Email'},
-                    {'value': 484, 'name': 'Union Ads'},
-                    {'value': 300, 'name': 'Video Ads'}
-                ]
-            },
-            {
-                'id': 'scatter_chart',
-                'title': 'Scatter Plot',
-                'chart_type': 'scatter',
-                'data': [
-                    [10.0, 8.04], [8.0, 6.95], [13.0, 7.58], [9.0, 8.81],
-                    [11.0, 8.33], [14.0, 9.96], [6.0, 7.24], [4.0, 4.26]
-                ]
-            },
+        logger.info("🔧 SlideController initialized - starting at slide %s", self.current_slide)
+        self.deck = deck or MemoryDeckStore()  # Where slides are persisted; see deck_store.py
+        self.slides = self.deck.load()  # Slide dicts; data may be left to deck.payload()
+        self._publish()
+        self.backend.start(self)
+
+    def _publish(self):
+        """Encode a new snapshot of the current state and wake stream listeners.
+
+        Only called by the writer; readers only ever see complete snapshots.
+        """
+        slide = client_slide(self.slides[self.current_slide])
+        if 'data' not in slide:
+            slide['data'] = json.loads(self._payload(slide))
+        slide['current_sub_slide'] = self.current_sub_slide
+        if 'sub_slides' in slide and len(slide['sub_slides']) > 0:
+            slide['total_sub_slides'] = len(slide['sub_slides'])
+            slide['current_sub_slide_data'] = slide['sub_slides'][self.current_sub_slide]
+
+        if self._manifest_json is None:
+            self._encode_deck()
+        manifest_json = b'{"slides": %s, "current_index": %d, "total": %d}' % (
+            self._manifest_json, self.current_slide, len(self.slides)
+        )
+
+        with self.changed:
+            self.revision += 1
+            self.snapshot = SlideSnapshot(
+                revision=self.revision,
+                etag=f"{self.epoch}-{self.revision}",
+                slide_json=json.dumps(slide).encode(),
+                manifest_json=manifest_json,
+                current_index=self.current_slide,
+                total=len(self.slides)
+            )
+            self.changed.notify_all()
+        with self.lock:
+            self.laser_changed.notify_all()  # Combined slide and laser streams wait on this one
+
+    def _encode_deck(self):
+        """Rebuild the caches derived from the deck after it changed (writer only).
+
+        Slides whose data is left to the deck or dataset store are encoded per request instead.
+        """
+        encoded = [json.dumps(client_slide(slide)).encode() if 'data' in slide else None for slide in self.slides]
+        manifest = [
             {
-                'id': 'china_map',
-                'title': 'Analog Migration',
-                'chart_type': 'china_map',
-                'data': {},
-                'sub_slides': [
-                    {
-                        'name': 'Beijing Top10',
-                        'selected': {'Beijing Top10': True, 'Shanghai Top10': False, 'Canton Top10': False}
-                    },
-                    {
-                        'name': 'Shanghai Top10',
-                        'selected': {'Beijing Top10': False, 'Shanghai Top10': True, 'Canton Top10': False}
-                    },
-                    {
-                        'name': 'Canton Top10',
-                        'selected': {'Beijing Top10': False, 'Shanghai Top10': False, 'Canton Top10': True}
-                    }
-                ]
+                'id': slide['id'],
+                'title': slide['title'],
+                'chart_type': slide['chart_type'],
+                'summary': slide.get('summary', ''),
+                'custom': slide.get('custom', False),
+                'sub_slides': len(slide.get('sub_slides') or []),
+                'data_size': len(body) if body is not None else slide['data_size']  # Bytes /api/slides/<id> will send
             }
+            for slide, body in zip(self.slides, encoded)
         ]
 
+        # Replaced, never mutated, so readers need no lock
+        self._slide_json = encoded
+        self.slide_index = {slide['id']: index for index, slide in enumerate(self.slides)}
+        self._manifest_json = json.dumps(manifest).encode()
+
+    def invalidate_deck(self):
+        """Mark the deck caches stale after slides were added (writer only)"""
+        self._manifest_json = None
+
+    def _payload(self, slide):
+        """Encoded data of a slide that does not carry it: uploads from the dataset store, others from the deck store"""
+        if 'dataset' not in slide:
+            return self.deck.payload(slide['id'])
+        key = ('dataset', slide['dataset'])
+        payload = payload_cache.get(key)
+        if payload is None:
+            payload = dataset_store.payload(slide['dataset'])
+            payload_cache.put(key, payload)
+        return payload
+
+    def _encode_slide(self, index):
+        """Encoded client view of one slide, reading its data from the deck or dataset store if needed"""
+        body = self._slide_json[index]
+        if body is not None:
+            return body
+        slide = self.slides[index]
+        head = json.dumps(client_slide(slide)).encode()
+        return head[:-1] + b', "data": ' + self._payload(slide) + b'}'
+
+    def get_slides_json(self, snapshot):
+        """Every slide with its data, as of a snapshot (encoded per call; lazy payloads go through the cache)"""
+        slides = b', '.join(self._encode_slide(index) for index in range(snapshot.total))
+        return b'{"slides": [%s], "current_index": %d, "total": %d}' % (slides, snapshot.current_index, snapshot.total)
+
+    def slide_level(self, slide_id, width=None):
+        """(position, level width, level) for the slide with this id, or None (lock-free, encodes nothing).
+
+        With a pixel width, large line/scatter slides are sent with the matching level of
+        detail; `level` is that level when it is not the default one the slide embeds.
+        """
+        index = self.slide_index.get(slide_id)
+        if index is None:
+            return None
+
+        lod = self.slides[index].get('lod')
+        if lod is None:
+            return index, None, None
+        if width is None:
+            return index, lod['default_width'], None
+
+        level = select_level(lod['levels'], width)
+        if level['width'] == lod['default_width']:
+            return index, level['width'], None
+        return index, level['width'], level
+
+    def get_slide_json(self, index, level=None):
+        """Encoded slide at a position, carrying `level` (from slide_level) instead of its default data"""
+        if level is None:
+            return self._encode_slide(index)
+
+        # Uploaded slides keep their other levels in the dataset store (memory-mapped)
+        slide = self.slides[index]
+        data = level['data'] if 'data' in level else dataset_store.load(slide['dataset'], level['width'])
+        return json.dumps(dict(client_slide(slide), data=data)).encode()
+
+    def wait_for_change(self, revision, timeout=None):
+        """Block until the revision differs from the given one, or timeout. Returns the latest revision"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.revision != revision, timeout)
+            return self.revision
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use (and again in a forked worker)"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_start_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name='slide-writer', daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        """Apply queued commands one at a time and publish a snapshot after each real change"""
+        handlers = {
+            'next_slide': self._apply_next_slide,
+            'previous_slide': self._apply_previous_slide,
+            'next_sub_slide': self._apply_next_sub_slide,
+            'previous_sub_slide': self._apply_previous_sub_slide,
+            'goto_slide': self._apply_goto_slide,
+            'add_slide': self._apply_add_slide,
+            'sync': lambda _: False  # Only picks up other workers' changes
+        }
+        while True:
+            command, argument, future = self.commands.get()
+            if command is None:
+                return  # Closed
+            try:
+                # Other workers may have moved the shared state since this worker last looked
+                with self.backend.transaction():
+                    synced = self.backend.sync_navigation(self)
+                    changed = handlers[command](argument)
+                    if changed:
+                        self.backend.save_navigation(self)
+                if synced or changed:
+                    self._publish()
+                future.set_result(self.snapshot)
+            except Exception as e:
+                logger.error("Error applying slide command %s: %s", command, e)
+                future.set_exception(e)
+            else:
+                if changed:
+                    # After the backend transaction, so logging never holds it open
+                    logger.info("🎞️ %s: now slide %d.%d", command, self.current_slide, self.current_sub_slide,
+                                extra={'fields': {'command': command, 'slide': self.current_slide,
+                                                  'sub_slide': self.current_sub_slide}})
+
+    def submit(self, command, argument=None):
+        """Queue a command for the writer; the returned future resolves to the snapshot it produced"""
+        self._ensure_writer()
+        future = Future()
+        self.commands.put((command, argument, future))
+        return future
+
+    def execute(self, command, argument=None):
+        """Queue a command for the writer and wait for the snapshot it produced"""
+        return self.submit(command, argument).result(timeout=COMMAND_TIMEOUT_SECONDS)
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def close(self):
+        """Stop the writer thread; the controller must not be used afterwards"""
+        if self._writer is not None and self._writer.is_alive():
+            self.commands.put((None, None, None))
+
+    def request_sync(self):
+        """Ask the writer to pull shared navigation state. Returns a future instead of waiting"""
+        return self.submit('sync')
+
+    def _apply_next_slide(self, _):
+        old_slide, old_sub = self.current_slide, self.current_sub_slide
+        if self.current_slide < len(self.slides) - 1:
+            self.current_slide += 1
+        else:
+            self.current_slide = 0
+        self.current_sub_slide = 0  # Reset sub-slide when changing slides
+        return (old_slide, old_sub) != (self.current_slide, self.current_sub_slide)
+
+    def _apply_previous_slide(self, _):
+        old_slide, old_sub = self.current_slide, self.current_sub_slide
+        if self.current_slide > 0:
+            self.current_slide -= 1
+        else:
+            self.current_slide = len(self.slides) - 1
+        self.current_sub_slide = 0  # Reset sub-slide when changing slides
+        return (old_slide, old_sub) != (self.current_slide, self.current_sub_slide)
+
+    def _apply_next_sub_slide(self, _):
+        sub_slides = self.slides[self.current_slide].get('sub_slides') or []
+        if not sub_slides:
+            return False
+
+        old_sub = self.current_sub_slide
+        if self.current_sub_slide < len(sub_slides) - 1:
+            self.current_sub_slide += 1
+        else:
+            self.current_sub_slide = 0
+        return old_sub != self.current_sub_slide
+
+    def _apply_previous_sub_slide(self, _):
+        sub_slides = self.slides[self.current_slide].get('sub_slides') or []
+        if not sub_slides:
+            return False
+
+        old_sub = self.current_sub_slide
+        if self.current_sub_slide > 0:
+            self.current_sub_slide -= 1
+        else:
+            self.current_sub_slide = len(sub_slides) - 1
+        return old_sub != self.current_sub_slide
+
+    def _apply_goto_slide(self, index):
+        old_slide = self.current_slide
+        if 0 <= index < len(self.slides) and index != old_slide:
+            self.current_slide = index
+            self.current_sub_slide = 0  # Reset sub-slide when changing slides
+        return old_slide != self.current_slide
+
+    def _apply_add_slide(self, slide):
+        self.slides.append(self.deck.add(slide))
+        self.invalidate_deck()
+        return True
+
+    def add_slide(self, slide):
+        """Append a slide to the deck and publish the change"""
+        self.execute('add_slide', slide)
+
     def get_current_slide(self):
-        with self.lock:
-            # Deep copy to avoid mutation issues
-            slide = json.loads(json.dumps(self.slides[self.current_slide]))
-            slide['current_sub_slide'] = self.current_sub_slide
-            if 'sub_slides' in slide and len(slide['sub_slides']) > 0:
-                slide['total_sub_slides'] = len(slide['sub_slides'])
-                slide['current_sub_slide_data'] = slide['sub_slides'][self.current_sub_slide]
-            logger.info(f"📖 GET_CURRENT_SLIDE: Returning slide {self.current_slide}/{self.current_sub_slide} - {slide['title']} (ID: {slide['id']})")
-            return slide
+        """Return the current slide as a fresh dict decoded from the latest snapshot (lock-free)"""
+        return json.loads(self.snapshot.slide_json)
 
     def next_slide(self):
-        with self.lock:
-            old_slide = self.current_slide
-            if self.current_slide < len(self.slides) - 1:
-                self.current_slide += 1
-            else:
-                self.current_slide = 0
-            self.current_sub_slide = 0  # Reset sub-slide when changing slides
-            slide = self.slides[self.current_slide]
-            logger.warning(f"⏭️ NEXT_SLIDE CALLED: {old_slide} → {self.current_slide} - Now showing: {slide['title']}")
-            return self.get_current_slide()
+        return json.loads(self.execute('next_slide').slide_json)
 
     def previous_slide(self):
-        with self.lock:
-            old_slide = self.current_slide
-            if self.current_slide > 0:
-                self.current_slide -= 1
-            else:
-                self.current_slide = len(self.slides) - 1
-            self.current_sub_slide = 0  # Reset sub-slide when changing slides
-            slide = self.slides[self.current_slide]
-            logger.warning(f"⏮️ PREVIOUS_SLIDE CALLED: {old_slide} → {self.current_slide} - Now showing: {slide['title']}")
-            return self.get_current_slide()
+        return json.loads(self.execute('previous_slide').slide_json)
 
     def next_sub_slide(self):
-        with self.lock:
-            slide = self.slides[self.current_slide]
-            if 'sub_slides' not in slide or len(slide['sub_slides']) == 0:
-                return self.get_current_slide()
-
-            old_sub = self.current_sub_slide
-            if self.current_sub_slide < len(slide['sub_slides']) - 1:
-                self.current_sub_slide += 1
-            else:
-                self.current_sub_slide = 0
-            logger.warning(f"⏩ NEXT_SUB_SLIDE CALLED: {old_sub} → {self.current_sub_slide}")
-            return self.get_current_slide()
+        return json.loads(self.execute('next_sub_slide').slide_json)
 
     def previous_sub_slide(self):
-        with self.lock:
-            slide = self.slides[self.current_slide]
-            if 'sub_slides' not in slide or len(slide['sub_slides']) == 0:
-                return self.get_current_slide()
-
-            old_sub = self.current_sub_slide
-            if self.current_sub_slide > 0:
-                self.current_sub_slide -= 1
-            else:
-                self.current_sub_slide = len(slide['sub_slides']) - 1
-            logger.warning(f"⏪ PREVIOUS_SUB_SLIDE CALLED: {old_sub} → {self.current_sub_slide}")
-            return self.get_current_slide()
+        return json.loads(self.execute('previous_sub_slide').slide_json)
 
     def goto_slide(self, index):
-        with self.lock:
-            old_slide = self.current_slide
-            if 0 <= index < len(self.slides):
-                self.current_slide = index
-            slide = self.slides[self.current_slide]
-            logger.warning(f"🎯 GOTO_SLIDE CALLED: {old_slide} → {self.current_slide} (requested: {index}) - Now showing: {slide['title']}")
-            return slide
+        return json.loads(self.execute('goto_slide', index).slide_json)
 
     def add_laser_point(self, x, y, intensity, container_width, container_height):
+        self.add_laser_points([(x, y, intensity)], container_width, container_height)
+
+    def add_laser_points(self, points, container_width, container_height):
+        """Add a batch of (x, y, intensity) points from one frame under a single lock acquisition"""
+        current_time = time.time()
+        if self.backend.shares_laser_points:
+            # Every worker, this one included, picks the points up through its state watcher
+            self.backend.append_laser_points(points, container_width, container_height, current_time,
+                                             keep=self.laser_points.capacity)
+        else:
+            with self.lock:
+                for x, y, intensity in points:
+                    self.laser_points.append(x, y, intensity, container_width, container_height, current_time)
+                self.last_laser_update = current_time
+                self.laser_changed.notify_all()
+        logger.debug("🔴 Added %d laser points", len(points))
+
+    def import_laser_points(self, rows, generation):
+        """Apply points read from the shared backend, keeping their sequence numbers"""
         with self.lock:
-            current_time = time.time()
-            # Remove old points (older than 5 seconds)
-            self.laser_points = [p for p in self.laser_points if current_time - p['timestamp'] < 5]
-
-            # Add new point
-            self.laser_points.append({
-                'x': x,
-                'y': y,
-                'intensity': intensity,
-                'container_width': container_width,
-                'container_height': container_height,
-                'timestamp': current_time
-            })
-            self.last_laser_update = current_time
-            logger.debug(f"🔴 Added laser point: ({x}, {y}) - Total points: {len(self.laser_points)}")
-
-    def get_laser_points(self):
+            if generation != self.laser_generation:
+                return  # Read before a clear; the watcher will look again
+            for row in rows:
+                self.laser_points.append(row['x'], row['y'], row['intensity'], row['container_width'],
+                                         row['container_height'], row['timestamp'], seq=row['seq'])
+            self.last_laser_update = rows[-1]['timestamp']
+            self.laser_changed.notify_all()
+
+    def get_laser_points(self, since=None, packed=False):
+        """Live laser points, or only those added at or after the `since` cursor.
+
+        `reset` tells the client its cursor could not be honoured and it received every
+        live point instead; `packed` returns parallel arrays instead of one dict per point.
+        """
         with self.lock:
-            current_time = time.time()
-            # Remove old points
-            self.laser_points = [p for p in self.laser_points if current_time - p['timestamp'] < 5]
+            self.laser_points.expire()
             return {
-                'points': self.laser_points,
+                'revision': self.laser_revision(),
+                'points': self.laser_points.packed_since(since) if packed else self.laser_points.points_since(since),
+                'cursor': self.laser_points.tail,
+                'reset': not self.laser_points.covers(since),
+                'generation': self.laser_generation,
                 'active': self.laser_active,
                 'last_update': self.last_laser_update
             }
 
+    def laser_revision(self):
+        """Opaque revision naming the laser state a delta brings the client up to (caller holds the lock)"""
+        return f"{self.epoch}-{self.laser_generation}-{self.laser_points.tail}"
+
+    def laser_cursor(self, revision):
+        """The cursor inside a revision from laser_revision(), or None if it is from another generation or process"""
+        try:
+            epoch, generation, cursor = revision.split('-')
+            if epoch == self.epoch and int(generation) == self.laser_generation:
+                return int(cursor)
+        except (AttributeError, ValueError):
+            pass
+        return None
+
+    def wait_for_laser(self, cursor, generation, timeout=None):
+        """Block until points arrive after cursor or the laser is cleared/toggled, or timeout"""
+        with self.laser_changed:
+            return self.laser_changed.wait_for(
+                lambda: self.laser_points.tail != cursor or self.laser_generation != generation,
+                timeout
+            )
+
+    def wait_for_update(self, revision, cursor, generation, timeout=None):
+        """Block until the slide revision moves or laser points arrive, or timeout.
+
+        Returns (slide changed, laser changed), for streams that carry both.
+        """
+        with self.laser_changed:
+            laser_moved = lambda: self.laser_points.tail != cursor or self.laser_generation != generation
+            self.laser_changed.wait_for(lambda: self.revision != revision or laser_moved(), timeout)
+            return self.revision != revision, laser_moved()
+
     def set_laser_active(self, active):
-        with self.lock:
-            self.laser_active = active
-            if not active:
-                self.laser_points = []  # Clear points when deactivated
-            self.last_laser_update = time.time()
-            logger.info(f"🔴 Laser set to: {'ON' if active else 'OFF'}")
+        self.apply_laser_flags(*self.backend.save_laser_flags(active))
+        logger.info("🔴 Laser set to: %s", 'ON' if active else 'OFF')
 
     def clear_laser_points(self):
+        self.apply_laser_flags(*self.backend.save_laser_flags())
+        logger.info("🧹 Laser points cleared")
+
+    def apply_laser_flags(self, active, generation):
+        """Apply a laser toggle/clear at the given generation; every generation starts with no points"""
         with self.lock:
-            self.laser_points = []
+            if generation <= self.laser_generation:
+                return  # Already applied, or older than what we have
+            self.laser_active = active
+            self.laser_points.clear()
+            self.laser_generation = generation
             self.last_laser_update = time.time()
-            logger.info("🧹 Laser points cleared")
+            self.laser_changed.notify_all()
 
     def set_video_stream(self, video_type, video_url="", room_id=""):
+        state = {'active': video_type != "none", 'type': video_type, 'url': video_url, 'room_id': room_id}
+        self.apply_video_state(state, self.backend.save_video(state))
+        logger.info("📹 Video stream set: %s - URL: %s - Room: %s", video_type, video_url, room_id)
+
+    def apply_video_state(self, state, revision):
+        """Apply a video state at the given revision, ignoring ones older than what we have"""
         with self.lock:
-            self.video_type = video_type
-            self.video_url = video_url
-            self.webcam_room_id = room_id
-            self.video_active = video_type != "none"
-            logger.info(f"📹 Video stream set: {video_type} - URL: {video_url} - Room: {room_id}")
+            if revision <= self.video_revision:
+                return
+            self.video_revision = revision
+            self.video_active = state['active']
+            self.video_type = state['type']
+            self.video_url = state['url']
+            self.webcam_room_id = state['room_id']
 
     def get_video_state(self):
         with self.lock:
             return {
+                'revision': f"{self.epoch}-{self.video_revision}",
                 'active': self.video_active,
                 'type': self.video_type,
                 'url': self.video_url,
@@ -261,14 +576,72 @@ class SlideController:
             }
 
     def stop_video_stream(self):
-        with self.lock:
-            self.video_active = False
-            self.video_type = "none"
-            self.video_url = ""
-            self.webcam_room_id = ""
-            logger.info("📹 Video stream stopped")
+        state = {'active': False, 'type': 'none', 'url': '', 'room_id': ''}
+        self.apply_video_state(state, self.backend.save_video(state))
+        logger.info("📹 Video stream stopped")
+
+payload_cache = PayloadCache(app.config['DECK_CACHE_BYTES'])
+
+def open_deck(name):
+    return create_deck_store(app.config['DECK_STORE'], app, payload_cache, name, fallback=app.config['DECK_STORE_FALLBACK'])
+
+default_deck = open_deck('default')
+# Shared backends hold only navigation state; slides reach the other workers through the deck store
+if app.config['STATE_BACKEND'] != 'memory' and not isinstance(default_deck, SQLDeckStore):
+    raise RuntimeError(f"STATE_BACKEND={app.config['STATE_BACKEND']} needs the database deck store (DECK_STORE=database)")
+
+slide_controller = SlideController(create_state_backend(
+    app.config['STATE_BACKEND'],
+    path=app.config['STATE_DB_PATH'],
+    dsn=app.config['SQLALCHEMY_DATABASE_URI'],
+    channel=app.config['STATE_NOTIFY_CHANNEL']
+), default_deck)
+
+# Rooms keep their live state in this process; only the global deck above uses the configured backend
+rooms = RoomRegistry(
+    lambda key: SlideController(InMemoryStateBackend(), open_deck(f"{key[0]}/{key[1]}")),
+    idle_timeout=app.config['ROOM_IDLE_TIMEOUT'],
+    max_rooms=app.config['ROOM_LIMIT']
+)
+
+def get_room(presentation_id, create=False):
+    """The controller a request addresses: the global deck, or a room of the caller's organization.
+
+    Only admin write endpoints pass create=True; reads of a room nobody opened are a 404.
+    """
+    if presentation_id is None:
+        return slide_controller
+    if not app.config['ROOMS_ENABLED']:
+        raise RoomsUnavailable("Presentation rooms need a single worker (STATE_BACKEND=memory)")
+    if len(presentation_id) > 64:
+        abort(404)
+    org_id = g.user.organization_id if g.get('user') else g.viewer['org']
+    room = rooms.get((org_id, presentation_id), create=create)
+    if room is None:
+        abort(404)
+    return room
+
+dataset_store = DatasetStore(app.config['DATASET_STORE_PATH'])
+
+chunked_uploads = ChunkedUploads(
+    os.path.join(app.config['UPLOAD_FOLDER'], 'chunked'),
+    chunk_size=app.config['UPLOAD_CHUNK_SIZE'],
+    max_bytes=app.config['CHUNKED_UPLOAD_MAX_BYTES']
+)
 
-slide_controller = SlideController()
+upload_jobs = UploadJobs(
+    dataset_store,
+    pool_size=app.config['UPLOAD_POOL_SIZE'],
+    queue_depth=app.config['UPLOAD_QUEUE_DEPTH']
+)
+
+@app.errorhandler(RoomLimitReached)
+def room_limit_reached(e):
+    return jsonify({'error': str(e)}), 503
+
+@app.errorhandler(RoomsUnavailable)
+def rooms_unavailable(e):
+    return jsonify({'error': str(e)}), 501
 
 # Authentication routes
 @app.route('/login', methods=['GET', 'POST'])
@@ -283,9 +656,20 @@ def login():
 
         user = User.query.filter_by(username=username).first()
 
-        if not user or not user.check_password(password):
-            flash('Invalid username or password', 'error')
-            return render_template('auth/login.html')
+        try:
+            if not user or not password_hasher.check(user.password_hash, password):
+                flash('Invalid username or password', 'error')
+                return render_template('auth/login.html')
+        except PasswordHasherBusy as e:
+            flash(str(e), 'error')
+            return render_template('auth/login.html'), 503
+
+        # Upgrade hashes made with an older method or cost; saved with the session below
+        try:
+            if password_hasher.needs_rehash(user.password_hash):
+                user.password_hash = password_hasher.hash(password)
+        except PasswordHasherBusy:
+            pass  # Next login will do it
 
         # Check if user can login (seat limits, etc.)
         can_login, message = user.can_login()
@@ -342,6 +726,12 @@ def register():
             flash('Username already exists', 'error')
             return render_template('auth/register.html')
 
+        try:
+            password_hash = password_hasher.hash(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'error')
+            return render_template('auth/register.html'), 503
+
         try:
             # Find or create organization
             organization = Organization.query.filter_by(name=organization_name).first()
@@ -354,9 +744,9 @@ def register():
             user = User(
                 username=username,
                 role=role if role in ['admin', 'standard'] else 'standard',
-                organization_id=organization.id
+                organization_id=organization.id,
+                password_hash=password_hash
             )
-            user.set_password(password)
 
             db.session.add(user)
             db.session.commit()
@@ -366,11 +756,52 @@ def register():
 
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Registration error: {e}")
+            logger.error("Registration error: %s", e)
             flash('Registration failed. Please try again.', 'error')
 
     return render_template('auth/register.html')
 
+@app.route('/api/users/bulk', methods=['POST'])
+@admin_required
+def bulk_create_users():
+    """Queue creating users in the admin's organization from a CSV/JSON file or {"users": [...]}.
+    The job's status, with a result for every row once done, is polled at status_url"""
+    try:
+        if 'file' in request.files:
+            rows = read_user_rows(request.files['file'])
+        else:
+            body = request.get_json(silent=True)
+            rows = body.get('users') if isinstance(body, dict) else None
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                return jsonify({'error': 'Send a CSV/JSON file or {"users": [{username, password, role}, ...]}'}), 400
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': f'Could not read users: {e}'}), 400
+
+    if len(rows) > app.config['BULK_USERS_MAX_ROWS']:
+        return jsonify({'error': f"At most {app.config['BULK_USERS_MAX_ROWS']} users per request"}), 413
+
+    try:
+        job_id = provisioning_jobs.submit(rows, g.user.organization_id)
+    except ProvisioningQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'rows': len(rows),
+        'status_url': url_for('bulk_create_users_status', job_id=job_id),
+        'message': 'User import queued'
+    }), 202
+
+@app.route('/api/users/bulk/jobs/<job_id>')
+@admin_required
+def bulk_create_users_status(job_id):
+    """Status of a user import: queued, running (with passwords hashed so far), done (with the report) or error"""
+    job = provisioning_jobs.status(job_id)
+    if job is None or job['organization_id'] != g.user.organization_id:
+        return jsonify({'error': 'User import not found'}), 404
+    return jsonify(job)
+
 @app.route('/')
 def index():
     if g.user:
@@ -416,8 +847,10 @@ def upload_page():
     return render_template('upload.html')
 
 @app.route('/api/upload', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/upload', methods=['POST'])
 @admin_required
-def upload_file():
+def upload_file(presentation_id=None):
+    room = get_room(presentation_id, create=True)
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -440,162 +873,290 @@ def upload_file():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
         file.save(filepath)
 
-        # Process the data based on file type
-        data = process_uploaded_data(filepath, chart_type)
-
-        # Create new slide
-        slide_id = f"custom_{uuid.uuid4().hex[:8]}"
-        new_slide = {
-            'id': slide_id,
-            'title': title,
-            'summary': summary,
-            'chart_type': chart_type,
-            'data': data,
-            'custom': True,
-            'filename': filename
-        }
+        return queue_upload(room, filepath, filename, chart_type, title, summary)
 
-        # Add to slides
-        slide_controller.slides.append(new_slide)
+    except Exception as e:
+        logger.error("Error uploading file: %s", e)
+        return jsonify({'error': str(e)}), 500
 
-        # Clean up uploaded file
+def queue_upload(room, filepath, filename, chart_type, title, summary):
+    """Hand a saved upload to the upload pool and answer with its job"""
+    # Create new slide; its data is filled in by the upload job
+    slide_id = f"custom_{uuid.uuid4().hex[:8]}"
+    new_slide = {
+        'id': slide_id,
+        'title': title,
+        'summary': summary,
+        'chart_type': chart_type,
+        'custom': True,
+        'filename': filename
+    }
+
+    # Parse and transform in the upload pool; the job adds the slide when it is done
+    try:
+        job_id = upload_jobs.submit(room, filepath, chart_type, new_slide)
+    except UploadQueueFull as e:
         os.remove(filepath)
+        return jsonify({'error': str(e)}), 503
 
-        return jsonify({
-            'success': True,
-            'slide_id': slide_id,
-            'message': 'Slide created successfully'
-        })
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'slide_id': slide_id,
+        'status_url': url_for('upload_job_status', job_id=job_id),
+        'message': 'Upload queued'
+    }), 202
+
+@app.route('/api/upload/chunked', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/upload/chunked', methods=['POST'])
+@admin_required
+def start_chunked_upload(presentation_id=None):
+    """Start a chunked upload: {filename, size, chart_type, title, summary}"""
+    get_room(presentation_id, create=True)  # Fail now, not after the transfer, if the room cannot be opened
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename', ''))
+    size = data.get('size')
+
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'File type not allowed'}), 400
+    if not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'File size required'}), 400
 
-    except Exception as e:
-        logger.error(f"Error uploading file: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    try:
+        upload = chunked_uploads.start(
+            filename=filename,
+            size=size,
+            chart_type=data.get('chart_type', 'line'),
+            title=data.get('title', 'Untitled Slide'),
+            summary=data.get('summary', ''),
+            presentation_id=presentation_id
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 413
+    return jsonify(upload), 201
 
-def process_uploaded_data(filepath, chart_type):
-    """Process uploaded data file and format for charts"""
+@app.route('/api/upload/chunked/<upload_id>', methods=['GET'])
+@admin_required
+def chunked_upload_status(upload_id):
+    """Bytes received so far; a client resuming a transfer sends the next chunk from there"""
     try:
-        # Read the file based on extension
-        if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath)
-        elif filepath.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(filepath)
-        elif filepath.endswith('.json'):
-            with open(filepath, 'r') as f:
-                json_data = json.load(f)
-            df = pd.DataFrame(json_data)
-        else:
-            raise ValueError("Unsupported file format")
-
-        # Format data based on chart type
-        if chart_type in ['line', 'bar']:
-            # Assume first column is x-axis, second is y-axis
-            if len(df.columns) >= 2:
-                x_axis = df.iloc[:, 0].astype(str).tolist()
-                series = df.iloc[:, 1].tolist()
-                return {'xAxis': x_axis, 'series': series}
-            else:
-                # Single column, use index as x-axis
-                series = df.iloc[:, 0].tolist()
-                x_axis = list(range(len(series)))
-                return {'xAxis': x_axis, 'series': series}
-
-        elif chart_type == 'pie':
-            # For pie charts, assume name and value columns
-            if len(df.columns) >= 2:
-                data = []
-                for _, row in df.iterrows():
-                    data.append({'name': str(row.iloc[0]), 'value': float(row.iloc[1])})
-                return data
-            else:
-                # Single column, count occurrences
-                value_counts = df.iloc[:, 0].value_counts()
-                data = []
-                for name, value in value_counts.items():
-                    data.append({'name': str(name), 'value': int(value)})
-                return data
-
-        elif chart_type == 'scatter':
-            # Assume two numeric columns
-            if len(df.columns) >= 2:
-                data = []
-                for _, row in df.iterrows():
-                    data.append([float(row.iloc[0]), float(row.iloc[1])])
-                return data
-            else:
-                raise ValueError("Scatter plot requires at least 2 columns")
+        return jsonify(chunked_uploads.status(upload_id))
+    except KeyError:
+        return jsonify({'error': 'Upload not found'}), 404
 
-        else:
-            # Default format for other chart types
-            return df.to_dict('records')
+@app.route('/api/upload/chunked/<upload_id>', methods=['PUT'])
+@admin_required
+def upload_chunk(upload_id):
+    """Write the request body at ?offset=<bytes>"""
+    offset = request.args.get('offset', type=int)
+    if offset is None or offset < 0 or request.content_length is None:
+        return jsonify({'error': 'offset and Content-Length required'}), 400
 
-    except Exception as e:
-        logger.error(f"Error processing data: {str(e)}")
-        raise e
+    try:
+        received = chunked_uploads.write(upload_id, offset, request.stream, request.content_length)
+    except KeyError:
+        return jsonify({'error': 'Upload not found'}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': str(e), 'received': e.received}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'upload_id': upload_id, 'received': received})
+
+@app.route('/api/upload/chunked/<upload_id>/finalize', methods=['POST'])
+@admin_required
+def finalize_chunked_upload(upload_id):
+    """Queue a fully received chunked upload for processing, like POST /api/upload"""
+    try:
+        upload = chunked_uploads.describe(upload_id)
+        room = get_room(upload['presentation_id'], create=True)
+        filepath, upload = chunked_uploads.finish(upload_id, app.config['UPLOAD_FOLDER'])
+    except KeyError:
+        return jsonify({'error': 'Upload not found'}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': str(e), 'received': e.received}), 409
+
+    return queue_upload(room, filepath, upload['filename'], upload['chart_type'], upload['title'], upload['summary'])
+
+@app.route('/api/upload/jobs/<job_id>')
+@admin_required
+def upload_job_status(job_id):
+    """Status of an upload job: queued, processing, adding, done or error"""
+    job = upload_jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Upload job not found'}), 404
+    return jsonify(job)
 
 @app.route('/api/current-slide')
-@standard_or_admin_required
-def current_slide():
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-    user_agent = request.environ.get('HTTP_USER_AGENT', 'Unknown')
-    referer = request.environ.get('HTTP_REFERER', 'No referer')
-    logger.info(f"📡 API/CURRENT-SLIDE called by {client_ip} - UA: {user_agent[:50]}... - Referer: {referer}")
-    return jsonify(slide_controller.get_current_slide())
+@app.route('/api/rooms/<presentation_id>/current-slide')
+@viewer_required
+def current_slide(presentation_id=None):
+    room = get_room(presentation_id)
+    snapshot = room.snapshot
+    return conditional_json(snapshot.etag, snapshot.slide_json)
+
+@app.route('/api/current-slide/stream')
+@app.route('/api/rooms/<presentation_id>/current-slide/stream')
+@viewer_required
+def current_slide_stream(presentation_id=None):
+    """Server-sent event stream that pushes the current slide whenever it changes.
+
+    With ?laser=1 the same stream also carries packed laser deltas (after the optional
+    ?since= cursor), so a presentation holds one worker thread instead of two.
+    Heartbeats are events rather than comments so clients can tell a stalled stream.
+    """
+    room = get_room(presentation_id)
+    with_laser = request.args.get('laser') == '1'
+    since = request.args.get('since', type=int)
+    # Authenticated and resolved: give the DB connection back before streaming for minutes
+    db.session.remove()
+
+    def generate():
+        started = time.time()
+        snapshot = room.snapshot
+        yield f"retry: 3000\nid: {snapshot.revision}\nevent: slide\ndata: {snapshot.slide_json.decode()}\n\n"
+        laser = None
+        if with_laser:
+            laser = room.get_laser_points(since, packed=True)
+            yield f"event: laser\ndata: {json.dumps(laser)}\n\n"
+
+        while time.time() - started < SSE_MAX_STREAM_SECONDS:
+            room.touch()  # An open stream keeps its room from being evicted
+            if laser is None:
+                slide_changed = room.wait_for_change(snapshot.revision, timeout=SSE_HEARTBEAT_SECONDS) != snapshot.revision
+                laser_changed = False
+            else:
+                slide_changed, laser_changed = room.wait_for_update(
+                    snapshot.revision, laser['cursor'], laser['generation'], timeout=SSE_HEARTBEAT_SECONDS
+                )
+
+            if not slide_changed and not laser_changed:
+                yield "event: heartbeat\ndata: {}\n\n"
+                continue
+            if slide_changed:
+                snapshot = room.snapshot
+                yield f"id: {snapshot.revision}\nevent: slide\ndata: {snapshot.slide_json.decode()}\n\n"
+            if laser_changed:
+                time.sleep(LASER_STREAM_MIN_INTERVAL)  # Let a few frames of points accumulate
+                laser = room.get_laser_points(laser['cursor'], packed=True)
+                yield f"event: laser\ndata: {json.dumps(laser)}\n\n"
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/state')
+@app.route('/api/rooms/<presentation_id>/state')
+@viewer_required
+def get_state(presentation_id=None):
+    """Slide, counter and laser state in one response, each section with its own revision.
+
+    Clients pass the revisions they hold (?slide=...&counter=...&laser=...) and only sections
+    that changed since are returned; ?sections= limits which ones are considered.
+    """
+    room = get_room(presentation_id)
+    wanted = request.args.get('sections', 'slide,counter,laser').split(',')
+    parts = []
+
+    snapshot = room.snapshot
+    if 'slide' in wanted and request.args.get('slide') != snapshot.etag:
+        # The slide is already encoded; splice it in rather than decoding it again
+        parts.append(b'"slide": {"revision": "%s", "data": %s}' % (snapshot.etag.encode(), snapshot.slide_json))
+    if 'counter' in wanted and request.args.get('counter') != snapshot.etag:
+        counter = {'revision': snapshot.etag, 'current_index': snapshot.current_index, 'total': snapshot.total}
+        parts.append(b'"counter": ' + json.dumps(counter).encode())
+
+    if 'laser' in wanted:
+        held = request.args.get('laser')
+        laser = room.get_laser_points(room.laser_cursor(held), packed=True)
+        if laser['revision'] != held:
+            parts.append(b'"laser": ' + json.dumps(laser).encode())
+
+    response = Response(b'{' + b', '.join(parts) + b'}', mimetype='application/json')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/slides')
-@standard_or_admin_required
-def get_slides():
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-    logger.info(f"📊 API/SLIDES called by {client_ip}")
-    return jsonify({
-        'slides': slide_controller.slides,
-        'current_index': slide_controller.current_slide,
-        'total': len(slide_controller.slides)
-    })
+@app.route('/api/rooms/<presentation_id>/slides')
+@viewer_required
+def get_slides(presentation_id=None):
+    room = get_room(presentation_id)
+    snapshot = room.snapshot
+    if request.if_none_match.contains(snapshot.etag):
+        return conditional_json(snapshot.etag, b'')  # Skip encoding the deck for a 304
+    return conditional_json(snapshot.etag, room.get_slides_json(snapshot))
+
+@app.route('/api/slides/manifest')
+@app.route('/api/rooms/<presentation_id>/slides/manifest')
+@viewer_required
+def get_slide_manifest(presentation_id=None):
+    """Id, title, chart type, sub-slide count and data size of every slide, plus the current index"""
+    room = get_room(presentation_id)
+    snapshot = room.snapshot
+    return conditional_json(snapshot.etag, snapshot.manifest_json)
+
+@app.route('/api/slides/<slide_id>')
+@app.route('/api/rooms/<presentation_id>/slides/<slide_id>')
+@viewer_required
+def get_slide(slide_id, presentation_id=None):
+    """One slide's full data, by id. ?width=<pixels> picks the level of detail for large datasets"""
+    room = get_room(presentation_id)
+    snapshot = room.snapshot
+    found = room.slide_level(slide_id, request.args.get('width', type=int))
+    if found is None:
+        return jsonify({'error': 'Slide not found'}), 404
+    index, width, level = found
+
+    etag = f"{snapshot.etag}-{slide_id}-{width}"
+    if request.if_none_match.contains(etag):
+        return conditional_json(etag, b'')  # Skip loading and encoding the data for a 304
+    return conditional_json(etag, room.get_slide_json(index, level))
 
 @app.route('/api/next-slide')
+@app.route('/api/rooms/<presentation_id>/next-slide')
 @admin_required
-def next_slide():
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-    user_agent = request.environ.get('HTTP_USER_AGENT', 'Unknown')
-    referer = request.environ.get('HTTP_REFERER', 'No referer')
-    logger.error(f"🚨 API/NEXT-SLIDE CALLED! IP: {client_ip} - UA: {user_agent[:50]}... - Referer: {referer}")
-    return jsonify(slide_controller.next_slide())
+def next_slide(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    return jsonify(room.next_slide())
 
 @app.route('/api/previous-slide')
+@app.route('/api/rooms/<presentation_id>/previous-slide')
 @admin_required
-def previous_slide():
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-    user_agent = request.environ.get('HTTP_USER_AGENT', 'Unknown')
-    referer = request.environ.get('HTTP_REFERER', 'No referer')
-    logger.error(f"🚨 API/PREVIOUS-SLIDE CALLED! IP: {client_ip} - UA: {user_agent[:50]}... - Referer: {referer}")
-    return jsonify(slide_controller.previous_slide())
+def previous_slide(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    return jsonify(room.previous_slide())
 
 @app.route('/api/goto-slide/<int:index>')
+@app.route('/api/rooms/<presentation_id>/goto-slide/<int:index>')
 @admin_required
-def goto_slide(index):
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-    user_agent = request.environ.get('HTTP_USER_AGENT', 'Unknown')
-    referer = request.environ.get('HTTP_REFERER', 'No referer')
-    logger.error(f"🚨 API/GOTO-SLIDE CALLED! Index: {index} - IP: {client_ip} - UA: {user_agent[:50]}... - Referer: {referer}")
-    return jsonify(slide_controller.goto_slide(index))
+def goto_slide(index, presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    return jsonify(room.goto_slide(index))
 
 @app.route('/api/next-sub-slide')
+@app.route('/api/rooms/<presentation_id>/next-sub-slide')
 @admin_required
-def next_sub_slide():
-    return jsonify(slide_controller.next_sub_slide())
+def next_sub_slide(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    return jsonify(room.next_sub_slide())
 
 @app.route('/api/previous-sub-slide')
+@app.route('/api/rooms/<presentation_id>/previous-sub-slide')
 @admin_required
-def previous_sub_slide():
-    return jsonify(slide_controller.previous_sub_slide())
+def previous_sub_slide(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    return jsonify(room.previous_sub_slide())
 
 # Laser overlay API endpoints
 @app.route('/api/laser/point', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/laser/point', methods=['POST'])
 @admin_required
-def add_laser_point():
+def add_laser_point(presentation_id=None):
+    room = get_room(presentation_id, create=True)
     try:
         data = request.get_json()
-        slide_controller.add_laser_point(
+        room.add_laser_point(
             data['x'],
             data['y'],
             data.get('intensity', 1.0),
@@ -604,35 +1165,104 @@ def add_laser_point():
         )
         return jsonify({'status': 'success'})
     except Exception as e:
-        logger.error(f"Error adding laser point: {e}")
+        logger.error("Error adding laser point: %s", e)
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+@app.route('/api/laser/batch', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/laser/batch', methods=['POST'])
+@admin_required
+def add_laser_batch(presentation_id=None):
+    """Accept one frame of laser points: {container_width, container_height, points: [[x, y, intensity], ...]}"""
+    room = get_room(presentation_id, create=True)
+    try:
+        data = request.get_json()
+        if len(data['points']) > MAX_LASER_BATCH:
+            return jsonify({'status': 'error', 'message': f'At most {MAX_LASER_BATCH} points per batch'}), 413
+
+        points = [
+            (float(p[0]), float(p[1]), float(p[2]) if len(p) > 2 else 1.0)
+            for p in data['points']
+        ]
+
+        room.add_laser_points(
+            points,
+            data.get('container_width', 800),
+            data.get('container_height', 600)
+        )
+        return jsonify({'status': 'success', 'count': len(points)})
+    except Exception as e:
+        logger.error("Error adding laser batch: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 @app.route('/api/laser/points')
-@standard_or_admin_required
-def get_laser_points():
-    return jsonify(slide_controller.get_laser_points())
+@app.route('/api/rooms/<presentation_id>/laser/points')
+@viewer_required
+def get_laser_points(presentation_id=None):
+    room = get_room(presentation_id)
+    return jsonify(room.get_laser_points(
+        request.args.get('since', type=int),
+        packed=request.args.get('format') == 'packed'
+    ))
+
+@app.route('/api/laser/stream')
+@app.route('/api/rooms/<presentation_id>/laser/stream')
+@viewer_required
+def laser_stream(presentation_id=None):
+    """Server-sent event stream of packed laser deltas, starting after the optional ?since= cursor.
+
+    Pages that also follow the slide use /api/current-slide/stream?laser=1 instead.
+    """
+    room = get_room(presentation_id)
+    since = request.args.get('since', type=int)
+    db.session.remove()  # See current_slide_stream
+
+    def generate():
+        started = time.time()
+        state = room.get_laser_points(since, packed=True)
+        yield f"retry: 3000\nevent: laser\ndata: {json.dumps(state)}\n\n"
+
+        while time.time() - started < SSE_MAX_STREAM_SECONDS:
+            room.touch()
+            if not room.wait_for_laser(state['cursor'], state['generation'], timeout=SSE_HEARTBEAT_SECONDS):
+                yield "event: heartbeat\ndata: {}\n\n"
+                continue
+            time.sleep(LASER_STREAM_MIN_INTERVAL)  # Let a few frames of points accumulate
+            state = room.get_laser_points(state['cursor'], packed=True)
+            yield f"event: laser\ndata: {json.dumps(state)}\n\n"
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/laser/active', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/laser/active', methods=['POST'])
 @admin_required
-def set_laser_active():
+def set_laser_active(presentation_id=None):
+    room = get_room(presentation_id, create=True)
     try:
         data = request.get_json()
-        slide_controller.set_laser_active(data.get('active', False))
+        room.set_laser_active(data.get('active', False))
         return jsonify({'status': 'success'})
     except Exception as e:
-        logger.error(f"Error setting laser active: {e}")
+        logger.error("Error setting laser active: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 @app.route('/api/laser/clear', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/laser/clear', methods=['POST'])
 @admin_required
-def clear_laser_points():
-    slide_controller.clear_laser_points()
+def clear_laser_points(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    room.clear_laser_points()
     return jsonify({'status': 'success'})
 
 # Video streaming API endpoints
 @app.route('/api/video/start', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/video/start', methods=['POST'])
 @admin_required
-def start_video_stream():
+def start_video_stream(presentation_id=None):
+    room = get_room(presentation_id, create=True)
     try:
         data = request.get_json()
         video_type = data.get('type', 'none')
@@ -644,25 +1274,66 @@ def start_video_stream():
             import uuid
             room_id = str(uuid.uuid4())[:8]
 
-        slide_controller.set_video_stream(video_type, video_url, room_id)
+        room.set_video_stream(video_type, video_url, room_id)
         return jsonify({
             'status': 'success',
-            'video_state': slide_controller.get_video_state()
+            'video_state': room.get_video_state()
         })
     except Exception as e:
-        logger.error(f"Error starting video stream: {e}")
+        logger.error("Error starting video stream: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 @app.route('/api/video/stop', methods=['POST'])
+@app.route('/api/rooms/<presentation_id>/video/stop', methods=['POST'])
 @admin_required
-def stop_video_stream():
-    slide_controller.stop_video_stream()
+def stop_video_stream(presentation_id=None):
+    room = get_room(presentation_id, create=True)
+    room.stop_video_stream()
     return jsonify({'status': 'success'})
 
 @app.route('/api/video/state')
+@app.route('/api/rooms/<presentation_id>/video/state')
+@viewer_required
+def get_video_state(presentation_id=None):
+    room = get_room(presentation_id)
+    return jsonify(room.get_video_state())
+
+@app.route('/api/viewer-ticket', methods=['POST'])
 @standard_or_admin_required
-def get_video_state():
-    return jsonify(slide_controller.get_video_state())
+def refresh_viewer_ticket():
+    """Reissue the viewer ticket cookie for the logged-in user"""
+    g.new_viewer_ticket = issue_viewer_ticket(g.user)
+    return jsonify({'expires_in': app.config['VIEWER_TICKET_TTL']})
+
+@app.route('/api/auth/session-cache')
+@admin_required
+def session_cache_stats():
+    """Hit/miss counters for the session token cache"""
+    return jsonify(session_cache.stats())
+
+@app.route('/api/auth/session-sweeper')
+@admin_required
+def session_sweeper_stats():
+    """Counts and timing of the background expired-session sweeps"""
+    return jsonify(session_sweeper.stats())
+
+@app.route('/api/auth/password-hasher')
+@admin_required
+def password_hasher_stats():
+    """Password hashing pool size, queue depth and how many operations were done or turned away"""
+    return jsonify(password_hasher.stats())
+
+@app.route('/api/state-backend')
+@admin_required
+def state_backend_stats():
+    """Which state backend is running, with its change propagation latency where measured"""
+    return jsonify(slide_controller.backend.stats())
+
+@app.route('/api/rooms')
+@admin_required
+def room_stats():
+    """How many presentation rooms are open in this process, and the slide data they keep cached"""
+    return jsonify(dict(rooms.stats(), deck_cache=payload_cache.stats()))
 
 # LiveKit token generation endpoint
 @app.route('/api/token', methods=['POST'])
@@ -694,7 +1365,7 @@ def generate_livekit_token():
         jwt_token = token.to_jwt()
         livekit_url = os.environ.get('LIVEKIT_URL', 'wss://localhost:7880')
 
-        logger.info(f"🎟️ Generated LiveKit token for {participant_name} in room {room_name}")
+        logger.info("🎟️ Generated LiveKit token for %s in room %s", participant_name, room_name)
 
         return jsonify({
             'token': jwt_token,
@@ -704,7 +1375,7 @@ def generate_livekit_token():
         })
 
     except Exception as e:
-        logger.error(f"Error generating LiveKit token: {e}")
+        logger.error("Error generating LiveKit token: %s", e)
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
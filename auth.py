@@ -1,10 +1,92 @@
 from functools import wraps
+from collections import OrderedDict
+from datetime import datetime
 from flask import session, request, jsonify, redirect, url_for, g, current_app
-from models import User, UserSession, db
+from models import User, Organization, UserSession, db
+import threading
+import time
 import logging
+import jwt
 
 logger = logging.getLogger(__name__)
 
+VIEWER_TICKET_COOKIE = 'viewer_ticket'
+
+class CachedUser:
+    """Detached copy of the user fields request handlers need, safe to share between requests"""
+    __slots__ = ('id', 'username', 'role', 'organization_id')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.role = user.role
+        self.organization_id = user.organization_id
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+    def is_admin(self):
+        """Check if user has admin role"""
+        return self.role == 'admin'
+
+    def is_standard(self):
+        """Check if user has standard role"""
+        return self.role == 'standard'
+
+class SessionCache:
+    """Bounded LRU cache of validated session token -> user, with a TTL on every entry"""
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # token -> (CachedUser, session expires_at, cached at)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        """Return the cached user for a token, or None if absent, stale or past session expiry"""
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is not None:
+                user, expires_at, cached_at = entry
+                if time.monotonic() - cached_at < self.ttl and datetime.utcnow() < expires_at:
+                    self.entries.move_to_end(token)
+                    self.hits += 1
+                    return user
+                del self.entries[token]
+            self.misses += 1
+            return None
+
+    def put(self, token, user, expires_at):
+        with self.lock:
+            self.entries[token] = (CachedUser(user), expires_at, time.monotonic())
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, token):
+        with self.lock:
+            self.entries.pop(token, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+session_cache = SessionCache()
+
 def login_required(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -44,12 +126,54 @@ def standard_or_admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def viewer_required(f):
+    """Decorator for read-only audience endpoints: a valid viewer ticket or any authenticated user.
+
+    Requests carrying a valid ticket skip the session lookup entirely (see init_auth).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not g.viewer and not g.user:
+            if request.is_json:
+                return jsonify({'error': 'Authentication required'}), 401
+            return redirect(url_for('login'))
+        return f(*args, **kwargs)
+    decorated_function.accepts_viewer_ticket = True
+    return decorated_function
+
+def issue_viewer_ticket(user):
+    """Sign a short-lived viewer ticket for the user"""
+    now = int(time.time())
+    claims = {
+        'typ': 'viewer',
+        'sub': str(user.id),
+        'role': user.role,
+        'org': user.organization_id,
+        'iat': now,
+        'exp': now + current_app.config['VIEWER_TICKET_TTL']
+    }
+    return jwt.encode(claims, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+def verify_viewer_ticket(ticket):
+    """Return the ticket's claims if its signature and expiry check out, otherwise None (no DB access)"""
+    if not ticket:
+        return None
+    try:
+        claims = jwt.decode(ticket, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    return claims if claims.get('typ') == 'viewer' else None
+
 def load_user_from_session():
-    """Load user from session token"""
+    """Load user from session token, consulting the session cache before the database"""
     session_token = session.get('session_token')
     if not session_token:
         return None
 
+    cached_user = session_cache.get(session_token)
+    if cached_user is not None:
+        return cached_user
+
     try:
         user_session = UserSession.query.filter_by(
             session_token=session_token,
@@ -58,27 +182,59 @@ def load_user_from_session():
 
         if not user_session or not user_session.is_valid():
             if user_session:
-                # Session expired, clean it up
-                user_session.invalidate()
+                # Session expired, clean it up and give back its seat
+                end_session(user_session, user_session.user)
                 db.session.commit()
             session.clear()
             return None
 
-        return user_session.user
+        user = user_session.user
+        session_cache.put(session_token, user, user_session.expires_at)
+        return CachedUser(user)
 
     except Exception as e:
-        logger.error(f"Error loading user from session: {e}")
+        logger.error("Error loading user from session: %s", e)
         session.clear()
         return None
 
+def end_session(user_session, user):
+    """Deactivate a session and release its seat, exactly once even if ended concurrently (caller commits)"""
+    ended = db.session.execute(
+        db.update(UserSession)
+        .where(UserSession.id == user_session.id, UserSession.is_active == True)
+        .values(is_active=False)
+        .returning(UserSession.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if ended and user.is_standard():
+        Organization.release_seats(user.organization_id)
+    return ended is not None
+
+def reclaim_expired_seats(organization_id):
+    """End the organization's expired standard-user sessions, releasing their seats. Returns how many (caller commits)"""
+    standard_users = db.select(User.id).where(User.organization_id == organization_id, User.role == 'standard')
+    expired = db.session.execute(
+        db.update(UserSession)
+        .where(
+            UserSession.is_active == True,
+            UserSession.expires_at < datetime.utcnow(),
+            UserSession.user_id.in_(standard_users)
+        )
+        .values(is_active=False)
+        .returning(UserSession.session_token)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    for token in expired:
+        session_cache.invalidate(token)
+    if expired:
+        Organization.release_seats(organization_id, len(expired))
+        logger.info("Reclaimed %s expired seats in organization %s", len(expired), organization_id)
+    return len(expired)
+
 def create_user_session(user, ip_address=None, user_agent=None):
     """Create a new session for user and handle seat management"""
     try:
-        # For standard users, increment seat count
-        if user.is_standard():
-            if not user.organization.increment_seat():
-                return None, "No available seats in organization"
-
         # Create session
         user_session = UserSession.create_session(
             user.id,
@@ -90,22 +246,29 @@ def create_user_session(user, ip_address=None, user_agent=None):
         db.session.add(user_session)
 
         # Update last login
-        from datetime import datetime
         user.last_login = datetime.utcnow()
 
+        # Standard users lease a seat until the session ends or expires. Taken last, so the
+        # organization row stays locked only until the commit below
+        if user.is_standard() and not Organization.lease_seat(user.organization_id):
+            if not (reclaim_expired_seats(user.organization_id) and Organization.lease_seat(user.organization_id)):
+                db.session.rollback()
+                return None, "No available seats in organization"
+
         db.session.commit()
 
-        # Store session token
+        # Store session token and hand out a viewer ticket with the response
+        g.new_viewer_ticket = issue_viewer_ticket(user)
         session['session_token'] = user_session.session_token
         session['user_id'] = user.id
         session.permanent = True
 
-        logger.info(f"Session created for user {user.username} (Role: {user.role})")
+        logger.info("Session created for user %s (Role: %s)", user.username, user.role)
         return user_session, "Session created successfully"
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error creating session: {e}")
+        logger.error("Error creating session: %s", e)
         return None, "Failed to create session"
 
 def destroy_user_session():
@@ -114,6 +277,9 @@ def destroy_user_session():
     if not session_token:
         return
 
+    session_cache.invalidate(session_token)
+    g.clear_viewer_ticket = True
+
     try:
         user_session = UserSession.query.filter_by(
             session_token=session_token,
@@ -123,58 +289,189 @@ def destroy_user_session():
         if user_session:
             user = user_session.user
 
-            # For standard users, decrement seat count
-            if user.is_standard():
-                user.organization.decrement_seat()
-
-            # Invalidate session
-            user_session.invalidate()
+            # Invalidate session and, for standard users, release the seat
+            end_session(user_session, user)
             db.session.commit()
 
-            logger.info(f"Session destroyed for user {user.username}")
+            logger.info("Session destroyed for user %s", user.username)
 
     except Exception as e:
-        logger.error(f"Error destroying session: {e}")
+        logger.error("Error destroying session: %s", e)
         db.session.rollback()
 
     finally:
         session.clear()
 
-def cleanup_expired_sessions():
-    """Clean up expired sessions and adjust seat counts"""
-    try:
-        # Get expired sessions that are still active
-        from datetime import datetime
-        expired_sessions = UserSession.query.filter(
-            UserSession.expires_at < datetime.utcnow(),
-            UserSession.is_active == True
-        ).all()
-
-        for user_session in expired_sessions:
-            user = user_session.user
+def sweep_expired_sessions(batch_size=1000):
+    """Delete expired sessions in batches of set-based statements, releasing the seats they held.
+
+    Each batch is its own short transaction. Returns (sessions deleted, seats released, batches).
+    """
+    deleted = released = batches = 0
+    while True:
+        ids = db.session.execute(
+            db.select(UserSession.id).where(UserSession.expires_at < datetime.utcnow()).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        # Sessions still active hold a seat. Deactivating them conditionally means a logout
+        # racing this sweep cannot release the same seat again
+        holders = db.session.execute(
+            db.update(UserSession)
+            .where(UserSession.id.in_(ids), UserSession.is_active == True)
+            .values(is_active=False)
+            .returning(UserSession.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        seats = {}  # organization id -> seats to release
+        if holders:
+            rows = db.session.execute(
+                db.select(User.id, User.organization_id).where(User.id.in_(set(holders)), User.role == 'standard')
+            ).all()
+            organization_of = dict(rows)
+            for user_id in holders:
+                if user_id in organization_of:
+                    seats[organization_of[user_id]] = seats.get(organization_of[user_id], 0) + 1
+        for organization_id, count in seats.items():
+            Organization.release_seats(organization_id, count)
+
+        tokens = db.session.execute(
+            db.delete(UserSession)
+            .where(UserSession.id.in_(ids))
+            .returning(UserSession.session_token)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
 
-            # For standard users, decrement seat count
-            if user and user.is_standard():
-                user.organization.decrement_seat()
+        # A cached token would otherwise keep authenticating until its cache entry expires
+        for token in tokens:
+            session_cache.invalidate(token)
 
-            # Remove expired session
-            db.session.delete(user_session)
-
-        db.session.commit()
-        logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        deleted += len(ids)
+        released += sum(seats.values())
+        batches += 1
+        if len(ids) < batch_size:
+            break
+    return deleted, released, batches
 
+def cleanup_expired_sessions():
+    """Clean up expired sessions and adjust seat counts (one full sweep)"""
+    try:
+        deleted, released, _ = sweep_expired_sessions()
+        logger.info("Cleaned up %s expired sessions, released %s seats", deleted, released)
     except Exception as e:
-        logger.error(f"Error cleaning up expired sessions: {e}")
+        logger.error("Error cleaning up expired sessions: %s", e)
         db.session.rollback()
 
+class SessionSweeper:
+    """Background thread that runs sweep_expired_sessions every `interval` seconds"""
+
+    def __init__(self, app=None, interval=300, batch_size=1000):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.sweeps = 0
+        self.errors = 0
+        self.total_deleted = 0
+        self.total_released = 0
+        self.last_sweep = None  # Counts and timing of the latest sweep
+
+    def start(self):
+        if self.thread is None and self.interval > 0:
+            self.thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sweep()
+
+    def sweep(self):
+        """Run one sweep now and record its counts and timing"""
+        started = time.monotonic()
+        with self.app.app_context():
+            try:
+                deleted, released, batches = sweep_expired_sessions(self.batch_size)
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Error sweeping expired sessions: %s", e)
+                with self.lock:
+                    self.errors += 1
+                return
+
+        duration = time.monotonic() - started
+        with self.lock:
+            self.sweeps += 1
+            self.total_deleted += deleted
+            self.total_released += released
+            self.last_sweep = {
+                'at': datetime.utcnow().isoformat(),
+                'deleted': deleted,
+                'seats_released': released,
+                'batches': batches,
+                'duration_ms': round(duration * 1000, 1)
+            }
+        if deleted:
+            logger.info("🧹 Swept %s expired sessions in %s batches (%.0fms), released %s seats", deleted, batches, duration * 1000, released)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'interval': self.interval,
+                'batch_size': self.batch_size,
+                'sweeps': self.sweeps,
+                'errors': self.errors,
+                'deleted': self.total_deleted,
+                'seats_released': self.total_released,
+                'last_sweep': self.last_sweep
+            }
+
+session_sweeper = SessionSweeper()  # Configured and started by init_auth
+
 def init_auth(app):
     """Initialize authentication system"""
 
     @app.before_request
     def load_logged_in_user():
-        """Load user before each request"""
+        """Load user before each request, or just verify the viewer ticket where that is enough"""
+        g.viewer = None
+        view = app.view_functions.get(request.endpoint)
+        if getattr(view, 'accepts_viewer_ticket', False):
+            g.viewer = verify_viewer_ticket(request.cookies.get(VIEWER_TICKET_COOKIE))
+            if g.viewer:
+                g.user = None
+                return
         g.user = load_user_from_session()
 
+    @app.after_request
+    def refresh_viewer_ticket(response):
+        """Set, refresh or clear the viewer ticket cookie"""
+        if g.get('clear_viewer_ticket'):
+            response.delete_cookie(VIEWER_TICKET_COOKIE)
+            return response
+
+        ticket = g.get('new_viewer_ticket')
+        if ticket is None and g.get('user') is not None:
+            # Reissue on session-authenticated requests once the ticket is past half its life
+            claims = verify_viewer_ticket(request.cookies.get(VIEWER_TICKET_COOKIE))
+            if not claims or claims['exp'] - time.time() < app.config['VIEWER_TICKET_TTL'] / 2:
+                ticket = issue_viewer_ticket(g.user)
+
+        if ticket is not None:
+            response.set_cookie(
+                VIEWER_TICKET_COOKIE, ticket,
+                max_age=app.config['VIEWER_TICKET_TTL'],
+                httponly=True, samesite='Lax', secure=request.is_secure
+            )
+        return response
+
     @app.context_processor
     def inject_user():
         """Make user available in templates"""
@@ -183,6 +480,15 @@ def init_auth(app):
     # Set session configuration
     app.config['PERMANENT_SESSION_LIFETIME'] = 86400  # 24 hours
 
-    # Cleanup expired sessions periodically (you might want to run this as a background task)
-    import atexit
-    atexit.register(cleanup_expired_sessions)
\ No newline at end of file
+    # Session cache sizing (seconds a validated token is trusted without a DB lookup)
+    session_cache.ttl = app.config.setdefault('SESSION_CACHE_TTL', 60)
+    session_cache.maxsize = app.config.setdefault('SESSION_CACHE_SIZE', 10000)
+
+    # Viewer tickets are not revocable, so keep them short-lived
+    app.config.setdefault('VIEWER_TICKET_TTL', 300)
+
+    # Sweep expired sessions in the background (0 disables, e.g. when a cron job runs cleanup_expired_sessions)
+    session_sweeper.app = app
+    session_sweeper.interval = app.config.setdefault('SESSION_SWEEP_INTERVAL', 300)
+    session_sweeper.batch_size = app.config.setdefault('SESSION_SWEEP_BATCH_SIZE', 1000)
+    session_sweeper.start()
\ No newline at end of file
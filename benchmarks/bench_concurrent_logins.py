@@ -0,0 +1,129 @@
+"""Log in many standard users at once against an organization's seat limit, then log them out.
+
+    python benchmarks/bench_concurrent_logins.py [--logins 500] [--seats 50]
+
+Every login goes through POST /login. A monitor thread samples the organization's
+current_seats throughout. The run fails if seats ever exceed seat_limit, if the logins
+granted differ from the seats available, or if seats are not back to 0 after logout.
+Uses DATABASE_URL if set (e.g. a scratch PostgreSQL database), otherwise a throwaway
+SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix='claude_maze_bench_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}")
+# A cheap hash, so the run measures seat accounting rather than password hashing
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+os.chdir(WORKDIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'benchmark'
+
+def create_users(app, password_hasher, logins, seats):
+    from models import db, Organization, User
+    with app.app_context():
+        organization = Organization(name=f'Benchmark {time.time()}', seat_limit=seats)
+        db.session.add(organization)
+        db.session.flush()
+        password_hash = password_hasher.hash(PASSWORD)
+        db.session.execute(db.insert(User), [
+            {
+                'username': f'bench-{organization.id}-{i}',
+                'password_hash': password_hash,
+                'role': 'standard',
+                'organization_id': organization.id,
+                'is_active': True
+            }
+            for i in range(logins)
+        ])
+        db.session.commit()
+        return organization.id, [f'bench-{organization.id}-{i}' for i in range(logins)]
+
+def seats_in_use(app, organization_id):
+    from models import db, Organization
+    with app.app_context():
+        return db.session.execute(
+            db.select(Organization.current_seats, Organization.seat_limit).where(Organization.id == organization_id)
+        ).one()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=500)
+    parser.add_argument('--seats', type=int, default=50)
+    args = parser.parse_args()
+
+    # Imported here, not at module level: the password pool's spawned processes re-import this file
+    from init_db import upgrade_database
+    upgrade_database()
+    from app import app, password_hasher
+    organization_id, usernames = create_users(app, password_hasher, args.logins, args.seats)
+    clients = [app.test_client() for _ in usernames]
+    granted, refused, failed, latencies = [], [], [], []
+    peak = {'seats': 0, 'over_limit': []}
+    start = threading.Barrier(len(usernames) + 1)
+    monitoring = threading.Event()
+    monitoring.set()
+
+    def log_in(client, username):
+        start.wait()
+        started = time.perf_counter()
+        response = client.post('/login', data={'username': username, 'password': PASSWORD})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 302 and response.location.endswith('/viewer'):
+            granted.append(client)
+        elif b'No available seats' in response.data:
+            refused.append(username)
+        else:
+            failed.append((username, response.status_code))
+
+    def monitor():
+        while monitoring.is_set():
+            try:
+                seats, limit = seats_in_use(app, organization_id)
+            except Exception:
+                continue  # The database is busy with logins; sample again
+            peak['seats'] = max(peak['seats'], seats)
+            if seats > limit:
+                peak['over_limit'].append(seats)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=log_in, args=pair) for pair in zip(clients, usernames)]
+    watcher = threading.Thread(target=monitor)
+    for thread in threads:
+        thread.start()
+    watcher.start()
+    started = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    seats_after_login, limit = seats_in_use(app, organization_id)
+
+    for client in granted:
+        client.get('/logout')
+    monitoring.clear()
+    watcher.join()
+    seats_after_logout, _ = seats_in_use(app, organization_id)
+
+    latencies.sort()
+    print(f"database:            {app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0]}")
+    print(f"logins:              {len(usernames)} at once, {limit} seats")
+    print(f"granted / refused:   {len(granted)} / {len(refused)} ({len(failed)} failed)")
+    print(f"throughput:          {len(usernames) / elapsed:.0f} logins/s ({elapsed:.2f}s)")
+    print(f"latency p50 / p99:   {latencies[len(latencies) // 2] * 1000:.0f}ms / {latencies[int(len(latencies) * 0.99)] * 1000:.0f}ms")
+    print(f"peak seats in use:   {peak['seats']}")
+    print(f"seats after login:   {seats_after_login}")
+    print(f"seats after logout:  {seats_after_logout}")
+
+    assert not failed, f"Logins failed: {failed[:5]}"
+    assert not peak['over_limit'], f"current_seats exceeded seat_limit: {max(peak['over_limit'])}"
+    assert len(granted) == min(limit, len(usernames)) == seats_after_login
+    assert seats_after_logout == 0
+
+if __name__ == '__main__':
+    main()
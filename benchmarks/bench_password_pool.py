@@ -0,0 +1,70 @@
+"""Login password checks per second, and how long other requests stall meanwhile, by pool size.
+
+    python benchmarks/bench_password_pool.py [--sizes 0,1,2,4] [--logins 64] [--method scrypt]
+
+Size 0 checks passwords inline in the request threads, as before the pool. A probe
+thread stands in for the slide polls of viewers already in: it wakes every 10ms and
+records how late it woke, which grows when login work holds the interpreter.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import check_password_hash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from passwords import PasswordHasher, hash_password
+
+def run(size, logins, concurrency, stored):
+    if size == 0:
+        hasher = None
+        check = check_password_hash
+    else:
+        hasher = PasswordHasher(pool_size=size, queue_depth=logins, timeout=600)
+        hasher.check(stored, 'password')  # Start the pool outside the timing
+        check = hasher.check
+
+    lags = []
+    probing = threading.Event()
+    probing.set()
+
+    def probe():
+        while probing.is_set():
+            started = time.perf_counter()
+            time.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as threads:
+        assert all(threads.map(lambda _: check(stored, 'password'), range(logins)))
+    elapsed = time.perf_counter() - started
+    probing.clear()
+    prober.join()
+    if hasher is not None:
+        hasher.pool.shutdown()
+
+    lags.sort()
+    return logins / elapsed, lags[len(lags) // 2], lags[int(len(lags) * 0.99)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='0,1,2,4')
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=32, help='request threads logging in at once')
+    parser.add_argument('--method', default=None, help="werkzeug hash method (default: werkzeug's)")
+    args = parser.parse_args()
+
+    stored = hash_password('password', args.method)
+    print(f"{os.cpu_count()} CPUs, {args.logins} logins from {args.concurrency} threads, {stored.split('$', 1)[0]}")
+    print(f"{'pool size':>9} {'logins/s':>9} {'probe lag p50':>14} {'p99':>8}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        throughput, lag_p50, lag_p99 = run(size, args.logins, args.concurrency, stored)
+        label = 'inline' if size == 0 else str(size)
+        print(f"{label:>9} {throughput:>9.1f} {lag_p50 * 1000:>12.1f}ms {lag_p99 * 1000:>6.1f}ms", flush=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Time process_uploaded_data against the row-by-row formatter it replaced.
+
+    python benchmarks/bench_upload_formatting.py [--rows 10000,100000,1000000] [--repeat 3]
+
+Each chart type gets a generated two-column CSV of every size; both versions read
+the same file, so the timings include parsing.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from uploads import process_uploaded_data
+
+CHART_TYPES = ('line', 'bar', 'pie', 'scatter')
+
+def rowwise_format(filepath, chart_type):
+    """The formatter before vectorization: iterrows() and per-cell float() for pie and scatter"""
+    df = pd.read_csv(filepath)
+    if chart_type in ('line', 'bar'):
+        return {'xAxis': df.iloc[:, 0].astype(str).tolist(), 'series': df.iloc[:, 1].tolist()}
+    if chart_type == 'pie':
+        return [{'name': str(row.iloc[0]), 'value': float(row.iloc[1])} for _, row in df.iterrows()]
+    return [[float(row.iloc[0]), float(row.iloc[1])] for _, row in df.iterrows()]
+
+def write_csv(folder, chart_type, rows):
+    rng = np.random.default_rng(rows)
+    if chart_type == 'scatter':
+        frame = pd.DataFrame({'x': rng.normal(size=rows), 'y': rng.normal(size=rows)})
+    else:
+        frame = pd.DataFrame({'label': [f'item {i}' for i in range(rows)], 'value': rng.uniform(0, 1000, rows).round(2)})
+    path = os.path.join(folder, f'{chart_type}_{rows}.csv')
+    frame.to_csv(path, index=False)
+    return path
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'chart':<8} {'rows':>9} {'row-by-row':>11} {'vectorized':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in (int(value) for value in args.rows.split(',')):
+            for chart_type in CHART_TYPES:
+                path = write_csv(folder, chart_type, rows)
+                # The row-by-row version takes minutes at 1M rows; once is enough there
+                old = best_of(1 if rows >= 1000000 else args.repeat, rowwise_format, path, chart_type)
+                new = best_of(args.repeat, process_uploaded_data, path, chart_type)
+                print(f"{chart_type:<8} {rows:>9} {old:>10.3f}s {new:>10.3f}s {old / new:>7.1f}x", flush=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATASET_FORMAT = 1  # Part of every key; bump when processing or the file layout changes
+
+class DatasetStore:
+    """Processed upload data on disk, keyed by a hash of the source file.
+
+    Each dataset is a directory of .npy column files, one set per level of detail plus
+    the full data, and a meta.json. Files are memory-mapped on read, so only the level
+    being served is ever turned into Python objects. Datasets are written once and
+    never modified, so identical uploads share one.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def digest(filepath, chart_type, chunk_size=1024 * 1024):
+        """Key of the dataset an upload produces: the file's bytes plus how they are processed"""
+        extension = os.path.splitext(filepath)[1].lower()
+        sha = hashlib.sha256(f"{DATASET_FORMAT}:{chart_type}:{extension}\0".encode())
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _path(self, key, *parts):
+        return os.path.join(self.root, key, *parts)
+
+    def has(self, key):
+        return os.path.exists(self._path(key, 'meta.json'))
+
+    def save(self, key, chart_type, data, lod=None):
+        """Write a processed dataset and its levels. A no-op if the key is already stored"""
+        if self.has(key):
+            return
+
+        levels = lod['levels'] if lod else [{'width': None, 'data': data}]
+        meta = {
+            'format': DATASET_FORMAT,
+            'chart_type': chart_type,
+            'points': lod['points'] if lod else None,
+            'default_width': lod['default_width'] if lod else None,
+            'widths': [level['width'] for level in levels if level['width'] is not None],
+            'data_size': None  # Bytes of the default level as slides serve it
+        }
+        default_width = meta['default_width']
+
+        # Written under a temporary name and renamed, so readers never see a partial dataset
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            for level in levels:
+                columns = encode_columns(chart_type, level['data'])
+                if columns is None:
+                    meta['records'] = True
+                    with open(os.path.join(staging, f"{level_name(level['width'])}.json"), 'w') as f:
+                        json.dump(level['data'], f)
+                    if level['width'] == default_width:
+                        meta['data_size'] = len(json.dumps(level['data']).encode())
+                    continue
+                if level['width'] == default_width:
+                    meta['data_size'] = len(json.dumps(decode_columns(chart_type, columns)).encode())
+                for column, values in columns.items():
+                    np.save(os.path.join(staging, f"{level_name(level['width'])}.{column}.npy"), values)
+
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            os.rename(staging, self._path(key))
+        except OSError:
+            if self.has(key):
+                # Another process stored the same upload first
+                shutil.rmtree(staging, ignore_errors=True)
+                return
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info("💾 Stored dataset %s (%s, %s levels)", key[:12], chart_type, len(levels))
+
+    def meta(self, key):
+        with open(self._path(key, 'meta.json')) as f:
+            return json.load(f)
+
+    def load(self, key, width=None, meta=None):
+        """Chart data of one level (width None: the full data)"""
+        meta = meta or self.meta(key)
+        name = level_name(width)
+        if meta.get('records'):
+            with open(self._path(key, f"{name}.json")) as f:
+                return json.load(f)
+
+        columns = {}
+        for column in COLUMNS[meta['chart_type']]:
+            columns[column] = np.load(self._path(key, f"{name}.{column}.npy"), mmap_mode='r', allow_pickle=False)
+        return decode_columns(meta['chart_type'], columns)
+
+    def payload(self, key, meta=None):
+        """The default level's data as encoded JSON, as slides serve it"""
+        meta = meta or self.meta(key)
+        return json.dumps(self.load(key, meta['default_width'], meta)).encode()
+
+    def attach(self, slide, key):
+        """The slide with a reference to a stored dataset; its data, every level, stays on disk and is loaded per request"""
+        meta = self.meta(key)
+        data_size = meta.get('data_size')
+        if data_size is None:
+            data_size = len(self.payload(key, meta))  # Stored before sizes were recorded
+        slide = dict(slide, dataset=key, data_size=data_size)
+        if meta['widths']:
+            slide['lod'] = {
+                'points': meta['points'],
+                'default_width': meta['default_width'],
+                'levels': [{'width': width} for width in meta['widths']] + [{'width': None}]
+            }
+        return slide
+
+def level_name(width):
+    return 'full' if width is None else str(width)
+
+# Column files of each chart type that stores columns
+COLUMNS = {
+    'line': ('xAxis', 'series'),
+    'bar': ('xAxis', 'series'),
+    'pie': ('name', 'value'),
+    'scatter': ('points',)
+}
+
+def encode_columns(chart_type, data):
+    """Chart data as {column: array}, or None for data kept as JSON records"""
+    if chart_type in ('line', 'bar'):
+        return {
+            'xAxis': np.asarray(data['xAxis']),
+            'series': np.array(data['series'], dtype='float64')  # None -> NaN
+        }
+    if chart_type == 'pie':
+        return {
+            'name': np.array([item['name'] for item in data], dtype=str),
+            'value': np.asarray([item['value'] for item in data])
+        }
+    if chart_type == 'scatter':
+        return {'points': np.asarray(data, dtype='float64')}
+    return None
+
+def decode_columns(chart_type, columns):
+    """Inverse of encode_columns"""
+    if chart_type in ('line', 'bar'):
+        series = columns['series']
+        return {
+            'xAxis': columns['xAxis'].tolist(),
+            'series': np.where(np.isnan(series), None, series).tolist()
+        }
+    if chart_type == 'pie':
+        return [
+            {'name': name, 'value': value}
+            for name, value in zip(columns['name'].tolist(), columns['value'].tolist())
+        ]
+    return columns['points'].tolist()
@@ -0,0 +1,224 @@
+import copy
+import threading
+import logging
+from collections import OrderedDict
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from models import db, Deck, Slide
+
+logger = logging.getLogger(__name__)
+
+# The deck every new presentation starts with
+BUILTIN_SLIDES = [
+    {
+        'id': 'line_chart',
+        'title': 'Line Chart',
+        'chart_type': 'line',
+        'data': {
+            'xAxis': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+            'series': [820, 932, 901, 934, 1290, 1330, 1320]
+        }
+    },
+    {
+        'id': 'bar_chart',
+        'title': 'Bar Chart',
+        'chart_type': 'bar',
+        'data': {
+            'xAxis': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
+            'series': [120, 200, 150, 80, 70, 110]
+        }
+    },
+    {
+        'id': 'pie_chart',
+        'title': 'Pie Chart',
+        'chart_type': 'pie',
+        'data': [
+            {'value': 1048, 'name': 'Search Engine'},
+            {'value': 735, 'name': 'Direct'},
+            {'value': 580, 'name': 'Email'},
+            {'value': 484, 'name': 'Union Ads'},
+            {'value': 300, 'name': 'Video Ads'}
+        ]
+    },
+    {
+        'id': 'scatter_chart',
+        'title': 'Scatter Plot',
+        'chart_type': 'scatter',
+        'data': [
+            [10.0, 8.04], [8.0, 6.95], [13.0, 7.58], [9.0, 8.81],
+            [11.0, 8.33], [14.0, 9.96], [6.0, 7.24], [4.0, 4.26]
+        ]
+    },
+    {
+        'id': 'china_map',
+        'title': 'Analog Migration',
+        'chart_type': 'china_map',
+        'data': {},
+        'sub_slides': [
+            {
+                'name': 'Beijing Top10',
+                'selected': {'Beijing Top10': True, 'Shanghai Top10': False, 'Canton Top10': False}
+            },
+            {
+                'name': 'Shanghai Top10',
+                'selected': {'Beijing Top10': False, 'Shanghai Top10': True, 'Canton Top10': False}
+            },
+            {
+                'name': 'Canton Top10',
+                'selected': {'Beijing Top10': False, 'Shanghai Top10': False, 'Canton Top10': True}
+            }
+        ]
+    }
+]
+
+class PayloadCache:
+    """Encoded slide payloads, least recently used first out once max_bytes is exceeded.
+
+    Shared by every deck of a process, so memory follows the slides being shown
+    rather than how many decks or slides exist.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> encoded payload
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = payload
+            self.size += len(payload)
+            # Keep at least the entry just added, even if it alone is over budget
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+class MemoryDeckStore:
+    """A deck that lives only in this process; slides keep their data inline"""
+
+    name = 'memory'
+
+    def load(self, start=0):
+        return copy.deepcopy(BUILTIN_SLIDES[start:])
+
+    def add(self, slide):
+        return slide
+
+    def payload(self, slide_id):
+        raise KeyError(slide_id)  # Every slide carries its data
+
+class SQLDeckStore:
+    """A deck persisted through the app database.
+
+    Slide metadata is loaded in one query; each slide's data is read on first use
+    and kept in the shared PayloadCache. Slides returned by load() and add() have
+    no 'data' key; SlideController asks payload() for it.
+    """
+
+    def __init__(self, app, cache, name='default'):
+        self.app = app
+        self.cache = cache
+        self.name = name
+        self.deck_id = None
+
+    def open(self):
+        """Find the deck, creating (and seeding) it on first use"""
+        with self.app.app_context():
+            if not inspect(db.engine).has_table(Slide.__tablename__):
+                raise RuntimeError("The decks and slides tables are missing; run `python init_db.py` to migrate the database")
+
+            deck = Deck.query.filter_by(name=self.name).first() or self._create_deck()
+            self.deck_id = deck.id
+
+    def load(self, start=0):
+        """Metadata of the deck's slides from position `start` on (data columns are deferred, so not read)"""
+        with self.app.app_context():
+            rows = Slide.query.filter(Slide.deck_id == self.deck_id, Slide.position >= start).order_by(Slide.position).all()
+            return [row.to_dict() for row in rows]
+
+    def _create_deck(self):
+        try:
+            deck = Deck(name=self.name)
+            db.session.add(deck)
+            db.session.flush()
+            for position, slide in enumerate(BUILTIN_SLIDES):
+                db.session.add(Slide.from_dict(deck.id, position, slide))
+            db.session.commit()
+            logger.info("🗂️ Created deck %s", self.name)
+            return deck
+        except IntegrityError:
+            # Another worker created it first
+            db.session.rollback()
+            return Deck.query.filter_by(name=self.name).one()
+
+    def add(self, slide):
+        """Persist a new slide at the end of the deck. Returns it without its data"""
+        with self.app.app_context():
+            last = db.session.query(db.func.max(Slide.position)).filter_by(deck_id=self.deck_id).scalar()
+            row = Slide.from_dict(self.deck_id, 0 if last is None else last + 1, slide)
+            db.session.add(row)
+            db.session.flush()
+            payload, slide = row.data.encode(), row.to_dict()
+            db.session.commit()
+
+        if 'dataset' not in slide:  # Uploaded slides are served from the dataset store
+            self.cache.put((self.name, slide['id']), payload)
+        return slide
+
+    def payload(self, slide_id):
+        """The slide's data as encoded JSON, from the cache or the database"""
+        key = (self.name, slide_id)
+        payload = self.cache.get(key)
+        if payload is None:
+            with self.app.app_context():
+                data = db.session.query(Slide.data).filter_by(deck_id=self.deck_id, slide_id=slide_id).scalar()
+            if data is None:
+                raise KeyError(slide_id)
+            payload = data.encode()
+            self.cache.put(key, payload)
+        return payload
+
+def create_deck_store(kind, app, cache, name='default', fallback=False):
+    """Deck store for one presentation.
+
+    If the database cannot be used this raises, unless `fallback` allows keeping the deck
+    in memory instead (each worker then has its own copy of the deck).
+    """
+    if kind == 'database':
+        store = SQLDeckStore(app, cache, name)
+        try:
+            store.open()
+            return store
+        except Exception as e:
+            if not fallback:
+                raise
+            logger.error("❌ Could not open deck %s in the database, keeping it in memory: %s", name, e)
+    elif kind != 'memory':
+        raise ValueError(f"Unknown deck store: {kind}")
+
+    return MemoryDeckStore()
@@ -1,16 +1,62 @@
 #!/usr/bin/env python3
 """
 Database initialization script for Claude Maze
-Creates tables and sample data for development/testing
+Migrates the schema to the latest revision and creates sample data for development/testing
 """
 
 import os
 import sys
-from app import app, db
-from models import Organization, User, UserSession
+from flask import Flask
+from flask_migrate import Migrate, stamp, upgrade
+from sqlalchemy import inspect
+from models import db
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Revisions matching databases created before migrations existed (by db.create_all and
+# runtime DDL), so they are stamped instead of created again
+BASELINE_REVISION = '707becb2a2a4'
+DECKS_REVISION = 'c03905414c02'
+
+def database_url():
+    url = os.environ.get('DATABASE_URL')
+    if url and url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url or 'postgresql://localhost/claude_maze'
+
+def upgrade_database():
+    """Apply pending migrations.
+
+    Runs on a bare app rather than the one in app.py, which opens the slide deck (and
+    so needs the schema) at import.
+    """
+    migration_app = Flask(__name__)
+    migration_app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+    migration_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(migration_app)
+    Migrate(migration_app, db, directory=MIGRATIONS)
+
+    with migration_app.app_context():
+        inspector = inspect(db.engine)
+        tables = inspector.get_table_names()
+        if 'organizations' in tables and 'alembic_version' not in tables:
+            indexes = [index['name'] for index in inspector.get_indexes('user_sessions')]
+            if 'slides' not in tables:
+                revision = BASELINE_REVISION
+            elif 'ix_user_sessions_expires_at_is_active' not in indexes:
+                revision = DECKS_REVISION
+            else:
+                revision = 'head'
+            print(f"📌 Existing schema without migration history, stamping {revision}")
+            stamp(directory=MIGRATIONS, revision=revision)
+        upgrade(directory=MIGRATIONS)
+        db.engine.dispose()
 
 def create_sample_data():
     """Create sample organizations and users for testing"""
+    from app import db
+    from models import Organization, User
+
     try:
         # Create sample organization
         sample_org = Organization(
@@ -51,10 +97,13 @@ def create_sample_data():
 def init_database():
     """Initialize the database"""
     try:
-        # Create all tables
+        upgrade_database()
+        print("✅ Database migrated successfully!")
+
+        from app import app
+        from models import User
+
         with app.app_context():
-            db.create_all()
-            print("✅ Database tables created successfully!")
 
             # Check if we should create sample data
             if len(User.query.all()) == 0:
@@ -0,0 +1,119 @@
+from array import array
+import time
+
+class LaserRingBuffer:
+    """Fixed-capacity ring of laser points stored column-wise.
+
+    Every point gets a monotonically increasing sequence number; the live window is
+    [head, tail). Expiring old points or overwriting when full only advances head.
+    Container size is stored once per stroke instead of once per point. Not thread
+    safe on its own - SlideController guards it with its lock.
+    """
+
+    def __init__(self, capacity=2048, max_age=5.0):
+        self.capacity = capacity
+        self.max_age = max_age
+
+        # Columnar storage, indexed by sequence number modulo capacity
+        self.x = array('d', bytes(8 * capacity))
+        self.y = array('d', bytes(8 * capacity))
+        self.intensity = array('d', bytes(8 * capacity))
+        self.timestamp = array('d', bytes(8 * capacity))
+        self.stroke = array('q', bytes(8 * capacity))
+
+        self.strokes = {}  # stroke id -> (container_width, container_height)
+        self.current_stroke = -1
+        self.head = 0  # Sequence number of the oldest live point
+        self.tail = 0  # Sequence number the next point will get
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def append(self, x, y, intensity, container_width, container_height, timestamp=None, seq=None):
+        """Add a point, starting a new stroke when the container size changes.
+
+        `seq` pins the point to a sequence number assigned elsewhere (the shared state
+        backend): points already held are skipped, and a gap restarts the live window.
+        """
+        if seq is not None:
+            if seq < self.tail:
+                return
+            if seq > self.tail:
+                self.head = self.tail = seq
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        size = (container_width, container_height)
+        if self.current_stroke < 0 or self.strokes.get(self.current_stroke) != size:
+            self.current_stroke += 1
+            self.strokes[self.current_stroke] = size
+
+        slot = self.tail % self.capacity
+        self.x[slot] = x
+        self.y[slot] = y
+        self.intensity[slot] = intensity
+        self.timestamp[slot] = timestamp
+        self.stroke[slot] = self.current_stroke
+        self.tail += 1
+
+        # Full: the oldest point is overwritten
+        if self.tail - self.head > self.capacity:
+            self.head = self.tail - self.capacity
+
+    def expire(self, now=None):
+        """Drop points older than max_age by advancing head"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.max_age
+
+        while self.head < self.tail and self.timestamp[self.head % self.capacity] <= cutoff:
+            self.head += 1
+
+        # Forget strokes that no live point references any more
+        oldest_stroke = self.stroke[self.head % self.capacity] if self.head < self.tail else self.current_stroke
+        for stroke_id in [s for s in self.strokes if s < oldest_stroke]:
+            del self.strokes[stroke_id]
+
+    def clear(self):
+        """Drop every point; sequence numbers keep counting so client cursors stay valid"""
+        self.head = self.tail
+        self.strokes = {}
+
+    def covers(self, cursor):
+        """True if every point from cursor onwards is still live (a delta from it is complete)"""
+        return cursor is not None and self.head <= cursor <= self.tail
+
+    def points_since(self, cursor=None):
+        """Return live points with a sequence number >= cursor (all live points if None)"""
+        start = cursor if self.covers(cursor) else self.head
+
+        points = []
+        for seq in range(start, self.tail):
+            slot = seq % self.capacity
+            width, height = self.strokes[self.stroke[slot]]
+            points.append({
+                'seq': seq,
+                'x': self.x[slot],
+                'y': self.y[slot],
+                'intensity': self.intensity[slot],
+                'container_width': width,
+                'container_height': height,
+                'timestamp': self.timestamp[slot]
+            })
+        return points
+
+    def packed_since(self, cursor=None):
+        """Like points_since, but as parallel arrays with container sizes listed once per stroke"""
+        start = cursor if self.covers(cursor) else self.head
+        slots = [seq % self.capacity for seq in range(start, self.tail)]
+
+        stroke_ids = [self.stroke[slot] for slot in slots]
+        return {
+            'x': [self.x[slot] for slot in slots],
+            'y': [self.y[slot] for slot in slots],
+            'i': [self.intensity[slot] for slot in slots],
+            't': [self.timestamp[slot] for slot in slots],
+            's': stroke_ids,
+            'strokes': {stroke_id: self.strokes[stroke_id] for stroke_id in set(stroke_ids)}
+        }
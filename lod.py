@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Target pixel widths of the levels built for large line and scatter datasets
+LOD_WIDTHS = (500, 1000, 2000, 4000)
+LOD_DEFAULT_WIDTH = 2000  # Level embedded in the slide itself (enough for a 1080p screen)
+SCATTER_CELL_PIXELS = 10  # Scatter levels keep one point per cell of about this many pixels
+
+def lttb(y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps when reducing y to threshold points.
+
+    x is taken to be the point index, as line charts here use a category axis.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Missing values only steer the selection; the caller keeps the originals
+    y = pd.Series(y, dtype='float64').interpolate(limit_direction='both').fillna(0).to_numpy()
+    x = np.arange(n, dtype='float64')
+
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Twice the area of the triangle (point a, candidate, next bucket average), for every candidate
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+def bin_scatter(points, grid):
+    """Reduce [x, y] points to one [x, y, count] point per occupied cell of a grid x grid raster"""
+    points = np.asarray(points, dtype='float64')
+    x, y = points[:, 0], points[:, 1]
+
+    def cell_of(values):
+        span = values.max() - values.min()
+        if span == 0:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - values.min()) / span * grid).astype(np.int64), grid - 1)
+
+    cells = cell_of(x) * grid + cell_of(y)
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+
+    # Each cell is drawn at the centroid of its points
+    return np.column_stack([
+        np.bincount(inverse, weights=x) / counts,
+        np.bincount(inverse, weights=y) / counts,
+        counts
+    ]).tolist()
+
+def build_lod(chart_type, data, widths=LOD_WIDTHS, default_width=LOD_DEFAULT_WIDTH):
+    """Build the level-of-detail pyramid for a chart's data.
+
+    Returns (default data, lod) where lod is None when the data is small enough to send
+    as is, or {'points', 'default_width', 'levels': [{'width', 'data'}, ...]} with the full
+    data as the last level (width None). Data may be lists or NumPy arrays; reduced line
+    levels are arrays.
+    """
+    if chart_type == 'line':
+        series = np.array(data['series'], dtype='float64')  # None -> NaN
+        x_axis = np.asarray(data['xAxis'])
+        n = len(series)
+
+        levels = []
+        for width in widths:
+            if width >= n:
+                break
+            keep = lttb(series, width)
+            levels.append({'width': width, 'data': {'xAxis': x_axis[keep], 'series': series[keep]}})
+
+    elif chart_type == 'scatter':
+        n = len(data)
+
+        levels = []
+        for width in widths:
+            grid = max(1, width // SCATTER_CELL_PIXELS)
+            if grid * grid >= n:
+                break
+            levels.append({'width': width, 'data': bin_scatter(data, grid)})
+
+    else:
+        return data, None
+
+    if not levels:
+        return data, None
+
+    levels.append({'width': None, 'data': data})
+    default = select_level(levels, default_width)
+    return default['data'], {'points': n, 'default_width': default['width'], 'levels': levels}
+
+def select_level(levels, width):
+    """The coarsest level at least `width` pixels wide, or the full data"""
+    for level in levels:
+        if level['width'] is not None and level['width'] >= width:
+            return level
+    return levels[-1]
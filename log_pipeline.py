@@ -0,0 +1,120 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from flask import g, request
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler renders every message in the calling thread before queueing it.
+    Here records are queued as they are, so log calls must pass arguments that are not
+    mutated afterwards (numbers, strings, tuples).
+    """
+
+    def prepare(self, record):
+        return record
+
+class StructuredFormatter(logging.Formatter):
+    """Text lines with key=value fields, or one JSON object per line.
+
+    Fields come from extra={'fields': {...}} on the log call.
+    """
+
+    def __init__(self, json_lines=False):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        self.json_lines = json_lines
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+    def format(self, record):
+        if not self.json_lines:
+            return super().format(record)
+
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class RouteSampler:
+    """Share of each endpoint's requests that get an access log line"""
+
+    def __init__(self, rates=None, default=1.0):
+        self.rates = dict(rates or {})  # endpoint -> rate between 0 and 1
+        self.default = default
+
+    def rate(self, endpoint):
+        return self.rates.get(endpoint, self.default)
+
+    def sample(self, endpoint):
+        rate = self.rate(endpoint)
+        return rate >= 1 or random.random() < rate
+
+def parse_sample_rates(spec):
+    """'current_slide=0.01,get_state=0' -> {'current_slide': 0.01, 'get_state': 0.0}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        endpoint, _, rate = item.partition('=')
+        rates[endpoint.strip()] = float(rate)
+    return rates
+
+def configure_logging(level='INFO', json_lines=False):
+    """Send all records through a queue to a listener thread that formats and writes them.
+
+    Logging calls then cost an enqueue; formatting and the write to stderr happen off
+    the request path. Returns the listener.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(json_lines))
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers[:] = [LazyQueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)  # Flush what is queued on exit
+    return listener
+
+def init_request_logging(app, sampler):
+    """Log one structured line for a sample of each endpoint's requests"""
+    request_logger = logging.getLogger('app.access')
+
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    # First of all before_request hooks, so durations include authentication and
+    # requests that another hook rejects still have a start time
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request_timer)
+
+    @app.after_request
+    def log_request(response):
+        endpoint = request.endpoint or 'unknown'
+        if not request_logger.isEnabledFor(logging.INFO) or not sampler.sample(endpoint):
+            return response
+
+        started = g.get('request_started')
+        request_logger.info('%s %s %s', request.method, request.path, response.status_code, extra={'fields': {
+            'endpoint': endpoint,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1) if started else None,
+            'client_ip': request.headers.get('X-Forwarded-For', request.remote_addr),
+            'user_agent': request.user_agent.string[:80],
+            'referer': request.referrer,
+            'sample_rate': sampler.rate(endpoint)
+        }})
+        return response
@@ -0,0 +1,27 @@
+"""Add index for expired session sweeps
+
+Revision ID: 5b8e2d41f0a7
+Revises: c03905414c02
+Create Date: 2026-10-16 23:41:12.104527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2d41f0a7'
+down_revision = 'c03905414c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older deployments got this index from the session sweeper at startup
+    with op.batch_alter_table('user_sessions', schema=None) as batch_op:
+        batch_op.create_index('ix_user_sessions_expires_at_is_active', ['expires_at', 'is_active'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_sessions_expires_at_is_active', if_exists=True)
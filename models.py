@@ -2,6 +2,7 @@ from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import secrets
+import json
 
 db = SQLAlchemy()
 
@@ -24,17 +25,31 @@ class Organization(db.Model):
         """Check if organization can add another seat"""
         return self.current_seats < self.seat_limit
 
-    def increment_seat(self):
-        """Increment current seats if possible"""
-        if self.can_add_seat():
-            self.current_seats += 1
-            return True
-        return False
+    @classmethod
+    def lease_seat(cls, organization_id):
+        """Take a seat if one is free, in one conditional UPDATE. Returns True if taken.
+
+        Concurrent logins cannot oversubscribe, and the row is locked only from this
+        statement to the caller's commit.
+        """
+        taken = db.session.execute(
+            db.update(cls)
+            .where(cls.id == organization_id, cls.current_seats < cls.seat_limit)
+            .values(current_seats=cls.current_seats + 1)
+            .returning(cls.current_seats)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return taken is not None
 
-    def decrement_seat(self):
-        """Decrement current seats"""
-        if self.current_seats > 0:
-            self.current_seats -= 1
+    @classmethod
+    def release_seats(cls, organization_id, count=1):
+        """Give back seats without reading the row first (never below zero)"""
+        db.session.execute(
+            db.update(cls)
+            .where(cls.id == organization_id)
+            .values(current_seats=db.case((cls.current_seats > count, cls.current_seats - count), else_=0))
+            .execution_options(synchronize_session=False)
+        )
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -71,7 +86,7 @@ class User(db.Model):
         return self.role == 'standard'
 
     def can_login(self):
-        """Check if user can login based on seat limits"""
+        """Check if user can login. Seats are taken (or refused) when the session is created"""
         if not self.is_active:
             return False, "Account is inactive"
 
@@ -79,14 +94,13 @@ class User(db.Model):
         if self.is_admin():
             return True, "Admin access granted"
 
-        # Check seat availability for standard users
-        if self.organization.can_add_seat():
-            return True, "Seat available"
-        else:
-            return False, "No available seats in organization"
+        return True, "Seat required"
 
 class UserSession(db.Model):
     __tablename__ = 'user_sessions'
+    __table_args__ = (
+        db.Index('ix_user_sessions_expires_at_is_active', 'expires_at', 'is_active'),  # Expired-session sweeps
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     session_token = db.Column(db.String(64), nullable=False, unique=True, index=True)
@@ -129,10 +143,73 @@ class UserSession(db.Model):
         """Invalidate this session"""
         self.is_active = False
 
+class Deck(db.Model):
+    __tablename__ = 'decks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False, unique=True)  # 'default' or '<org id>/<presentation id>'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationship
+    slides = db.relationship('Slide', backref='deck', lazy=True, cascade='all, delete-orphan', order_by='Slide.position')
+
+    def __repr__(self):
+        return f'<Deck {self.name}>'
+
+class Slide(db.Model):
+    __tablename__ = 'slides'
+    __table_args__ = (
+        db.UniqueConstraint('deck_id', 'slide_id'),
+        db.UniqueConstraint('deck_id', 'position')
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False, index=True)
+    slide_id = db.Column(db.String(64), nullable=False)  # Id clients use
+    position = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    chart_type = db.Column(db.String(50), nullable=False)
+    summary = db.Column(db.Text)
+    custom = db.Column(db.Boolean, default=False)
+    filename = db.Column(db.String(255))
+    sub_slides = db.Column(db.JSON)
+    dataset = db.Column(db.String(64))  # DatasetStore key of uploaded slides
+    lod = db.Column(db.JSON)  # Level-of-detail summary; level data stays in the dataset store
+    data_size = db.Column(db.Integer, nullable=False, default=0)  # Bytes of encoded data
+    data = db.deferred(db.Column(db.Text, nullable=False))  # Encoded JSON, only read when asked for
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Slide {self.slide_id}>'
+
+    # Optional slide fields, omitted from to_dict() when unset
+    OPTIONAL_FIELDS = ('summary', 'custom', 'filename', 'sub_slides', 'dataset', 'lod')
+
     @classmethod
-    def cleanup_expired(cls):
-        """Remove expired sessions"""
-        expired_sessions = cls.query.filter(cls.expires_at < datetime.utcnow()).all()
-        for session in expired_sessions:
-            db.session.delete(session)
-        return len(expired_sessions)
\ No newline at end of file
+    def from_dict(cls, deck_id, position, slide):
+        """Row for a slide dict as SlideController uses them (uploaded slides keep their data in the dataset store)"""
+        data = json.dumps(slide.get('data'))
+        return cls(
+            deck_id=deck_id,
+            slide_id=slide['id'],
+            position=position,
+            title=slide['title'],
+            chart_type=slide['chart_type'],
+            data=data,
+            data_size=slide['data_size'] if 'data' not in slide else len(data),
+            **{field: slide[field] for field in cls.OPTIONAL_FIELDS if field in slide}
+        )
+
+    def to_dict(self):
+        """The slide without its data (which is deferred)"""
+        slide = {
+            'id': self.slide_id,
+            'title': self.title,
+            'chart_type': self.chart_type,
+            'data_size': self.data_size
+        }
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                slide[field] = value
+        return slide
@@ -0,0 +1,150 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import concurrent.futures
+from werkzeug.security import generate_password_hash, check_password_hash
+import multiprocessing
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def hash_password(password, method=None):
+    """generate_password_hash with werkzeug's default method when none is given"""
+    if method is None:
+        return generate_password_hash(password)
+    return generate_password_hash(password, method)
+
+class PasswordHasherBusy(Exception):
+    """Raised when a password operation cannot be done now: the queue is full, it timed out
+    or the pool broke. Callers answer 503 and the user retries."""
+
+class PasswordHasher:
+    """Password hashing and checking in a process pool.
+
+    Each hash costs hundreds of milliseconds of CPU, so doing it in request threads
+    starves everything else the worker serves. At most queue_depth operations wait or
+    run at once; past that callers get PasswordHasherBusy at once instead of queueing.
+    An operation holds its slot until the pool is done with it, even if its caller gave
+    up waiting, so the depth bounds the work queued in the pool too.
+    """
+
+    def __init__(self, pool_size=2, queue_depth=32, method=None, timeout=30):
+        self.pool_size = pool_size
+        self.queue_depth = queue_depth
+        self.method = method  # werkzeug method string, e.g. 'scrypt' or 'pbkdf2:sha256:600000'; None for werkzeug's default
+        self.timeout = timeout  # Seconds to wait for one operation
+        self.slots = threading.BoundedSemaphore(queue_depth)
+        self.lock = threading.Lock()
+        self.pool = None
+        self._prefix = None  # Stored-hash prefix `method` produces, learned on first use
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _ensure_pool(self):
+        """Start the pool on first use (caller holds the lock). Spawned, not forked: this process runs threads"""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+    def _acquire(self):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Too many logins in progress, try again shortly")
+
+    def _submit(self, fn, *args):
+        """Submit under a slot the caller holds; the slot is released once the pool is done with the task"""
+        pool = None
+        try:
+            with self.lock:
+                self._ensure_pool()
+                pool = self.pool
+                future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self.slots.release()
+            self._discard(pool)
+            raise PasswordHasherBusy("Password hashing is restarting, try again shortly")
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return pool, future
+
+    def _wait(self, pool, future, timeout):
+        """Result of a submitted task, turning a timeout or a broken pool into PasswordHasherBusy"""
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # Dropped if it has not started; otherwise its slot frees when it ends
+            with self.lock:
+                self.timed_out += 1
+            raise PasswordHasherBusy("Password check took too long, try again shortly")
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise PasswordHasherBusy("Password hashing is restarting, try again shortly")
+
+    def _discard(self, pool):
+        """Forget a broken pool so the next call starts a fresh one"""
+        with self.lock:
+            if self.pool is pool:
+                self.pool = None
+
+    def _run(self, fn, *args):
+        self._acquire()
+        pool, future = self._submit(fn, *args)
+        result = self._wait(pool, future, self.timeout)
+        with self.lock:
+            self.completed += 1
+        return result
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(hash_password, password, self.method)
+
+    def hash_many(self, passwords, batch_size=None, progress=None):
+        """Hash a list of passwords in order, a batch at a time (default: one per pool process).
+
+        Each hash takes a queue slot like a login does, so at most a batch is queued in the
+        pool ahead of a login arriving meanwhile. Waits for free slots when logins fill the
+        queue rather than failing. progress, if given, is called with the number hashed so far.
+        """
+        batch_size = batch_size or self.pool_size
+        hashes = []
+        for start in range(0, len(passwords), batch_size):
+            batch = []
+            for password in passwords[start:start + batch_size]:
+                if not self.slots.acquire(timeout=self.timeout):
+                    raise PasswordHasherBusy("Password hashing is busy with logins, try again shortly")
+                batch.append(self._submit(hash_password, password, self.method))
+            for pool, future in batch:
+                hashes.append(self._wait(pool, future, self.timeout))
+            with self.lock:
+                self.completed += len(batch)
+            if progress is not None:
+                progress(len(hashes))
+        return hashes
+
+    def check(self, password_hash, password):
+        """Whether the password matches the stored hash"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with another method or cost than the configured one"""
+        if self._prefix is None:
+            # The method as werkzeug spells it out in hashes, with its default cost filled in
+            self._prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pool_size': self.pool_size,
+                'queue_depth': self.queue_depth,
+                'method': self._prefix or self.method,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
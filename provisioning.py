@@ -0,0 +1,215 @@
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import io
+import json
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models import db, User
+
+logger = logging.getLogger(__name__)
+
+USERNAME_MAX_LENGTH = 80  # users.username column size
+PASSWORD_MIN_LENGTH = 6  # Same rule as /register
+
+def read_user_rows(file):
+    """Rows of a CSV (username, password, role columns) or JSON (list of objects) upload"""
+    text = file.read().decode('utf-8-sig')
+    if file.filename.lower().endswith('.json'):
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON must be a list of user objects")
+        return rows
+    return list(csv.DictReader(io.StringIO(text)))
+
+def validate_rows(rows):
+    """One result per row, with an error set for rows that cannot be created"""
+    results = []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        username = str(row.get('username') or '').strip()
+        password = str(row.get('password') or '')
+        role = str(row.get('role') or 'standard').strip()
+        result = {'row': number, 'username': username, 'role': role, 'status': 'error', 'error': None}
+
+        if not username or not password:
+            result['error'] = 'Username and password are required'
+        elif len(username) > USERNAME_MAX_LENGTH:
+            result['error'] = f'Username is longer than {USERNAME_MAX_LENGTH} characters'
+        elif len(password) < PASSWORD_MIN_LENGTH:
+            result['error'] = f'Password must be at least {PASSWORD_MIN_LENGTH} characters long'
+        elif role not in ('admin', 'standard'):
+            result['error'] = 'Role must be admin or standard'
+        elif username in seen:
+            result['error'] = 'Username appears more than once in the file'
+        else:
+            seen.add(username)
+
+        results.append((result, password))
+    return results
+
+def existing_usernames(usernames):
+    """Which of the usernames are taken, in one query"""
+    if not usernames:
+        return set()
+    return set(db.session.execute(db.select(User.username).where(User.username.in_(usernames))).scalars())
+
+def provision_users(rows, organization_id, hasher, chunk_size=500, progress=None):
+    """Create users in bulk for one organization. Returns a report with one result per row.
+
+    Uniqueness is checked with one query, passwords are hashed a batch at a time through
+    the hasher's queue, and users are inserted with one executemany per chunk.
+    progress, if given, is called with the number of passwords hashed so far.
+    """
+    validated = validate_rows(rows)
+    candidates = [(result, password) for result, password in validated if result['error'] is None]
+
+    taken = existing_usernames([result['username'] for result, _ in candidates])
+    for result, _ in candidates:
+        if result['username'] in taken:
+            result['error'] = 'Username already exists'
+    candidates = [(result, password) for result, password in candidates if result['error'] is None]
+
+    if progress is not None:
+        progress(0, len(candidates))
+    hashes = hasher.hash_many(
+        [password for _, password in candidates],
+        progress=None if progress is None else lambda hashed: progress(hashed, len(candidates))
+    )
+
+    now = datetime.utcnow()
+    for start in range(0, len(candidates), chunk_size):
+        chunk = [
+            (result, {
+                'username': result['username'],
+                'password_hash': password_hash,
+                'role': result['role'],
+                'organization_id': organization_id,
+                'is_active': True,
+                'created_at': now
+            })
+            for (result, _), password_hash in zip(candidates[start:start + chunk_size], hashes[start:start + chunk_size])
+        ]
+        insert_chunk(chunk)
+
+    report = [result for result, _ in validated]
+    created = sum(1 for result in report if result['status'] == 'created')
+    logger.info("👥 Provisioned %s of %s users for organization %s", created, len(report), organization_id)
+    return {'created': created, 'failed': len(report) - created, 'results': report}
+
+def insert_chunk(chunk):
+    """Insert one chunk of users in a single statement and transaction"""
+    if not chunk:
+        return
+    try:
+        db.session.execute(db.insert(User), [values for _, values in chunk])
+        db.session.commit()
+    except IntegrityError:
+        # Someone registered one of these names since the uniqueness check; retry without them
+        db.session.rollback()
+        taken = existing_usernames([result['username'] for result, _ in chunk])
+        for result, _ in chunk:
+            if result['username'] in taken:
+                result['error'] = 'Username already exists'
+        remaining = [(result, values) for result, values in chunk if result['username'] not in taken]
+        if len(remaining) == len(chunk):
+            raise
+        insert_chunk(remaining)
+        return
+
+    for result, _ in chunk:
+        result['status'] = 'created'
+
+class ProvisioningQueueFull(Exception):
+    """Raised when too many bulk imports are already queued or running"""
+
+class ProvisioningJobs:
+    """Bulk user imports run in background threads, with their status kept for polling.
+
+    Hashing thousands of passwords takes minutes, far longer than a request should. Jobs
+    live in the process that accepted them, so with several gunicorn workers a status
+    request must reach the same worker (or be retried).
+    """
+
+    def __init__(self, app, hasher, workers=1, queue_depth=4, retention=3600):
+        self.app = app  # Jobs run in its app context
+        self.hasher = hasher
+        self.queue_depth = queue_depth  # Most jobs queued or running at once
+        self.retention = retention  # Seconds finished jobs stay queryable
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='provisioning')
+        self.jobs = {}  # job id -> job dict
+        self.lock = threading.Lock()
+
+    def submit(self, rows, organization_id):
+        """Queue an import of validated-shape rows into the organization. Returns the job id"""
+        with self.lock:
+            self._prune()
+            active = sum(1 for job in self.jobs.values() if job['status'] in ('queued', 'running'))
+            if active >= self.queue_depth:
+                raise ProvisioningQueueFull(f"{active} user imports are already running, try again shortly")
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'status': 'queued',
+                'organization_id': organization_id,
+                'rows': len(rows),
+                'hashed': 0,
+                'to_hash': None,
+                'created': None,
+                'failed': None,
+                'results': None,
+                'error': None,
+                'created_at': time.time(),
+                'finished_at': None
+            }
+            self.jobs[job['id']] = job
+
+        # The rows (and their passwords) go to the worker only, never into the job's status
+        self.executor.submit(self._run, job, rows)
+        logger.info("👥 Queued user import %s of %s rows for organization %s", job['id'], len(rows), organization_id)
+        return job['id']
+
+    def _run(self, job, rows):
+        job['status'] = 'running'
+
+        def progress(hashed, to_hash):
+            job['hashed'], job['to_hash'] = hashed, to_hash
+
+        with self.app.app_context():
+            try:
+                report = provision_users(rows, job['organization_id'], self.hasher, progress=progress)
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Error in user import %s: %s", job['id'], e)
+                self._finish(job, str(e))
+                return
+
+        job.update(created=report['created'], failed=report['failed'], results=report['results'])
+        self._finish(job)
+
+    def _finish(self, job, error=None):
+        job['error'] = error
+        job['status'] = 'error' if error else 'done'
+        job['finished_at'] = time.time()
+
+    def _prune(self):
+        """Forget finished jobs past their retention (caller holds the lock)"""
+        cutoff = time.time() - self.retention
+        for job_id in [i for i, job in self.jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self.jobs[job_id]
+
+    def status(self, job_id):
+        """Public view of a job, or None if unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'queue_depth': self.queue_depth, 'jobs': counts}
@@ -0,0 +1,123 @@
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RoomLimitReached(Exception):
+    """Raised when a new room is requested but the registry is full"""
+
+class RoomsUnavailable(Exception):
+    """Raised when rooms are addressed in a deployment that cannot keep them consistent"""
+
+class RoomRegistry:
+    """Presentation rooms keyed by (organization id, presentation id).
+
+    Rooms are opened by get(key, create=True) and evicted once idle. The table is split into
+    stripes, each with its own lock, so lookups of different rooms rarely contend;
+    past the lookup every room has its own SlideController and locks.
+    """
+
+    def __init__(self, factory, stripes=64, idle_timeout=1800, max_rooms=1000, sweep_interval=60):
+        self.factory = factory  # key -> new room
+        self.stripes = [({}, {}, threading.Lock()) for _ in range(stripes)]  # (rooms, rooms being opened, lock)
+        self.idle_timeout = idle_timeout
+        self.max_rooms = max_rooms
+        self.sweep_interval = sweep_interval
+        self.count = 0
+        self.count_lock = threading.Lock()
+        self.sweep_lock = threading.Lock()
+        self.last_sweep = time.monotonic()
+
+    def _stripe(self, key):
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    def get(self, key, create=True):
+        """Return the room for key, creating it on first use if `create`, else None if it is not open.
+
+        The factory runs outside the stripe lock (it may load a deck from the database), so a
+        slow open never blocks other rooms on the stripe. Requests for a room that is being
+        opened wait for that open instead of starting another.
+        """
+        rooms, opening, lock = self._stripe(key)
+        while True:
+            with lock:
+                room = rooms.get(key)
+                if room is not None:
+                    room.touch()
+                    break
+                if not create:
+                    return None
+                opened = opening.get(key)
+                if opened is None:
+                    opened = opening[key] = threading.Event()
+                    break  # This request opens it
+            opened.wait()
+
+        if room is None:
+            try:
+                room = self._open(key)
+                with lock:
+                    rooms[key] = room
+            finally:
+                with lock:
+                    opening.pop(key).set()  # Waiters look again (and one retries if the open failed)
+
+        self._maybe_sweep()
+        return room
+
+    def _open(self, key):
+        with self.count_lock:
+            if self.count >= self.max_rooms:
+                raise RoomLimitReached(f"At most {self.max_rooms} rooms can be open")
+            self.count += 1  # Reserved now so concurrent opens cannot overshoot max_rooms
+
+        try:
+            room = self.factory(key)
+        except Exception:
+            with self.count_lock:
+                self.count -= 1
+            raise
+        logger.info("🚪 Opened room %s", key)
+        return room
+
+    def evict_idle(self, now=None):
+        """Close and forget rooms nobody has used for idle_timeout seconds. Returns how many"""
+        if now is None:
+            now = time.monotonic()
+
+        evicted = 0
+        for rooms, _, lock in self.stripes:
+            with lock:
+                idle = [(k, rooms.pop(k)) for k, room in list(rooms.items()) if now - room.last_access > self.idle_timeout]
+            # Closed outside the lock: stopping a room's writer must not hold up other rooms on the stripe
+            for key, room in idle:
+                room.close()
+                logger.info("🚪 Closed idle room %s", key)
+            evicted += len(idle)
+
+        with self.count_lock:
+            self.count -= evicted
+        return evicted
+
+    def _maybe_sweep(self):
+        """Evict idle rooms at most once per sweep_interval, from whichever request gets there first"""
+        if time.monotonic() - self.last_sweep < self.sweep_interval:
+            return
+        if not self.sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self.last_sweep = time.monotonic()
+            self.evict_idle()
+        finally:
+            self.sweep_lock.release()
+
+    def stats(self):
+        with self.count_lock:
+            count = self.count
+        return {
+            'rooms': count,
+            'max_rooms': self.max_rooms,
+            'stripes': len(self.stripes),
+            'idle_timeout': self.idle_timeout
+        }
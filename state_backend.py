@@ -0,0 +1,452 @@
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import select
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+logger = logging.getLogger(__name__)
+
+def sync_slides(controller):
+    """Append slides other workers added to the shared deck store (writer only).
+
+    Backends share navigation state only; slides live in the deck store, which every
+    worker of a shared backend reads (DECK_STORE=database).
+    """
+    new_slides = controller.deck.load(len(controller.slides))
+    if new_slides:
+        controller.slides.extend(new_slides)
+        controller.invalidate_deck()
+
+class InMemoryStateBackend:
+    """Presentation state lives only in this process (a single gunicorn worker)"""
+    name = 'memory'
+    shares_laser_points = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.video_revision = 0
+        self.laser_active = False
+        self.laser_generation = 0
+
+    def start(self, controller):
+        pass
+
+    def transaction(self):
+        return nullcontext()
+
+    def sync_navigation(self, controller):
+        """Pull navigation/deck changes made elsewhere into the controller. Returns True if any"""
+        return False
+
+    def save_navigation(self, controller):
+        pass
+
+    def save_video(self, video_state):
+        """Return the revision the new video state is stored at"""
+        with self.lock:
+            self.video_revision += 1
+            return self.video_revision
+
+    def save_laser_flags(self, active=None):
+        """Toggle (active=True/False) or just clear (active=None) the laser. Returns (active, generation)"""
+        with self.lock:
+            if active is not None:
+                self.laser_active = active
+            self.laser_generation += 1
+            return self.laser_active, self.laser_generation
+
+    def stats(self):
+        return {'backend': self.name}
+
+class SQLiteStateBackend:
+    """Presentation state shared by every worker on the host through a SQLite database in WAL mode.
+
+    Writers commit to the database; a watcher thread in each worker polls PRAGMA data_version
+    and applies other workers' commits to its local SlideController view. Navigation changes
+    are applied through the controller's writer thread so it stays the only slide writer.
+    """
+    name = 'sqlite'
+    shares_laser_points = True
+
+    def __init__(self, path, poll_interval=0.02):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.local = threading.local()  # One connection per thread
+        self.wake = threading.Event()  # Set after local writes so the watcher checks right away
+        self.watcher = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS presentation_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                current_slide INTEGER NOT NULL DEFAULT 0,
+                current_sub_slide INTEGER NOT NULL DEFAULT 0,
+                nav_revision INTEGER NOT NULL DEFAULT 0,
+                video TEXT NOT NULL DEFAULT '{"active": false, "type": "none", "url": "", "room_id": ""}',
+                video_revision INTEGER NOT NULL DEFAULT 0,
+                laser_active INTEGER NOT NULL DEFAULT 0,
+                laser_generation INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS laser_points (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                x REAL NOT NULL,
+                y REAL NOT NULL,
+                intensity REAL NOT NULL,
+                container_width REAL NOT NULL,
+                container_height REAL NOT NULL,
+                timestamp REAL NOT NULL
+            );
+            INSERT OR IGNORE INTO presentation_state (id) VALUES (1);
+        """)
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are explicit BEGIN IMMEDIATE blocks
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Serialize a read-modify-write across every worker"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.wake.set()
+
+    def start(self, controller):
+        """Pick up the shared state and start watching for other workers' changes"""
+        controller.request_sync()
+
+        self.watcher = threading.Thread(target=self._watch, args=(controller,), name='state-watcher', daemon=True)
+        self.watcher.start()
+
+    def sync_navigation(self, controller):
+        """Pull navigation/deck changes made elsewhere into the controller. Returns True if any"""
+        conn = self.connection()
+        row = conn.execute(
+            "SELECT current_slide, current_sub_slide, nav_revision FROM presentation_state WHERE id = 1"
+        ).fetchone()
+        if row['nav_revision'] == controller.store_revision:
+            return False
+
+        sync_slides(controller)
+        controller.current_slide = row['current_slide']
+        controller.current_sub_slide = row['current_sub_slide']
+        controller.store_revision = row['nav_revision']
+        return True
+
+    def save_navigation(self, controller):
+        """Persist the controller's navigation state (added slides are already in the deck store)"""
+        conn = self.connection()
+        conn.execute(
+            "UPDATE presentation_state SET current_slide = ?, current_sub_slide = ?, nav_revision = nav_revision + 1 WHERE id = 1",
+            (controller.current_slide, controller.current_sub_slide)
+        )
+        controller.store_revision = conn.execute(
+            "SELECT nav_revision FROM presentation_state WHERE id = 1"
+        ).fetchone()[0]
+
+    def save_video(self, video_state):
+        """Store the video state and return its new revision"""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE presentation_state SET video = ?, video_revision = video_revision + 1 WHERE id = 1",
+                (json.dumps(video_state),)
+            )
+            return conn.execute("SELECT video_revision FROM presentation_state WHERE id = 1").fetchone()[0]
+
+    def save_laser_flags(self, active=None):
+        """Toggle (active=True/False) or just clear (active=None) the laser. Returns (active, generation)"""
+        with self.transaction() as conn:
+            if active is not None:
+                conn.execute("UPDATE presentation_state SET laser_active = ? WHERE id = 1", (int(active),))
+            conn.execute("UPDATE presentation_state SET laser_generation = laser_generation + 1 WHERE id = 1")
+            conn.execute("DELETE FROM laser_points")
+            row = conn.execute("SELECT laser_active, laser_generation FROM presentation_state WHERE id = 1").fetchone()
+            return bool(row['laser_active']), row['laser_generation']
+
+    def append_laser_points(self, points, container_width, container_height, timestamp, keep=2048):
+        """Store a batch of (x, y, intensity) points; the watcher feeds them to every worker"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO laser_points (x, y, intensity, container_width, container_height, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                [(x, y, intensity, container_width, container_height, timestamp) for x, y, intensity in points]
+            )
+            # Only the newest `keep` points can still be in any worker's ring buffer
+            conn.execute("DELETE FROM laser_points WHERE seq <= (SELECT MAX(seq) FROM laser_points) - ?", (keep,))
+
+    def stats(self):
+        return {'backend': self.name, 'path': self.path, 'poll_interval': self.poll_interval}
+
+    def _watch(self, controller):
+        """Apply other workers' commits to this worker's controller"""
+        conn = self.connection()
+        last_version = None
+        while True:
+            self.wake.wait(self.poll_interval)
+            self.wake.clear()
+            try:
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == last_version:
+                    continue
+                last_version = version
+
+                # One read transaction, so the points match the laser generation
+                conn.execute("BEGIN")
+                try:
+                    row = conn.execute("SELECT * FROM presentation_state WHERE id = 1").fetchone()
+                    rows = conn.execute(
+                        "SELECT * FROM laser_points WHERE seq >= ? ORDER BY seq", (controller.laser_points.tail,)
+                    ).fetchall()
+                finally:
+                    conn.execute("COMMIT")
+
+                if row['nav_revision'] != controller.store_revision:
+                    controller.request_sync()
+                controller.apply_video_state(json.loads(row['video']), row['video_revision'])
+                controller.apply_laser_flags(bool(row['laser_active']), row['laser_generation'])
+                if rows:
+                    controller.import_laser_points(rows, row['laser_generation'])
+            except Exception as e:
+                logger.error("Error applying shared state changes: %s", e)
+
+class LatencyStats:
+    """Running publish -> apply latency figures for a change feed"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = None
+
+    def record(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.last = seconds
+
+    def stats(self):
+        with self.lock:
+            return {
+                'count': self.count,
+                'avg_ms': self.total / self.count * 1000 if self.count else None,
+                'max_ms': self.max * 1000,
+                'last_ms': self.last * 1000 if self.last is not None else None
+            }
+
+class PostgresStateBackend:
+    """Presentation state shared by every app node through Postgres.
+
+    Navigation, video and laser on/off/clear state is stored in the app database and every
+    change is announced with NOTIFY in the same transaction. Each node runs a listener thread
+    that applies the announcements to its local SlideController view. Laser points themselves
+    stay on the node that received them (they are far too frequent for NOTIFY).
+    """
+    name = 'postgres'
+    shares_laser_points = False
+
+    def __init__(self, dsn, channel='presentation_state', max_connections=4):
+        self.dsn = dsn
+        self.channel = channel
+        self.node_id = uuid.uuid4().hex[:8]  # Tells this node's own announcements apart in logs
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, max_connections, dsn)
+        self.pool_slots = threading.BoundedSemaphore(max_connections)  # The pool raises rather than waits when empty
+        self.local = threading.local()  # Cursor of the writer thread's open transaction
+        self.latency = LatencyStats()
+        self.listener = None
+        self.connected = False
+
+        with self._cursor() as cur:
+            # Nodes may start at the same time; CREATE TABLE IF NOT EXISTS is not race free
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext('presentation_state'))")
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS presentation_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    current_slide INTEGER NOT NULL DEFAULT 0,
+                    current_sub_slide INTEGER NOT NULL DEFAULT 0,
+                    nav_revision BIGINT NOT NULL DEFAULT 0,
+                    video TEXT NOT NULL DEFAULT '{"active": false, "type": "none", "url": "", "room_id": ""}',
+                    video_revision BIGINT NOT NULL DEFAULT 0,
+                    laser_active BOOLEAN NOT NULL DEFAULT FALSE,
+                    laser_generation BIGINT NOT NULL DEFAULT 0
+                );
+                INSERT INTO presentation_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+            """)
+
+    @contextmanager
+    def _cursor(self):
+        """A pooled connection's cursor inside one transaction (committed on success)"""
+        with self.pool_slots:
+            conn = self.pool.getconn()
+            try:
+                with conn, conn.cursor() as cur:
+                    yield cur
+            finally:
+                self.pool.putconn(conn)
+
+    def _notify(self, cur, kind, **payload):
+        """Announce a change; Postgres delivers it only if the transaction commits"""
+        payload.update(kind=kind, node=self.node_id, published_at=time.time())
+        cur.execute("SELECT pg_notify(%s, %s)", (self.channel, json.dumps(payload)))
+
+    @contextmanager
+    def transaction(self):
+        """Serialize a read-modify-write across every node by locking the state row"""
+        with self._cursor() as cur:
+            cur.execute("SELECT nav_revision FROM presentation_state WHERE id = 1 FOR UPDATE")
+            self.local.cur = cur
+            try:
+                yield cur
+            finally:
+                self.local.cur = None
+
+    def start(self, controller):
+        """Start listening for other nodes' changes (the listener catches up with the stored state first)"""
+        self.listener = threading.Thread(target=self._listen, args=(controller,), name='state-listener', daemon=True)
+        self.listener.start()
+
+    def sync_navigation(self, controller):
+        """Pull navigation/deck changes made elsewhere into the controller. Returns True if any"""
+        cur = self.local.cur
+        cur.execute("SELECT current_slide, current_sub_slide, nav_revision FROM presentation_state WHERE id = 1")
+        current_slide, current_sub_slide, nav_revision = cur.fetchone()
+        if nav_revision == controller.store_revision:
+            return False
+
+        sync_slides(controller)
+        controller.current_slide = current_slide
+        controller.current_sub_slide = current_sub_slide
+        controller.store_revision = nav_revision
+        return True
+
+    def save_navigation(self, controller):
+        """Persist and announce the controller's navigation state (added slides are already in the deck store)"""
+        cur = self.local.cur
+        cur.execute(
+            "UPDATE presentation_state SET current_slide = %s, current_sub_slide = %s, nav_revision = nav_revision + 1 "
+            "WHERE id = 1 RETURNING nav_revision",
+            (controller.current_slide, controller.current_sub_slide)
+        )
+        controller.store_revision = cur.fetchone()[0]
+        self._notify(cur, 'navigation', revision=controller.store_revision)
+
+    def save_video(self, video_state):
+        """Store and announce the video state, returning its new revision"""
+        with self._cursor() as cur:
+            cur.execute(
+                "UPDATE presentation_state SET video = %s, video_revision = video_revision + 1 WHERE id = 1 RETURNING video_revision",
+                (json.dumps(video_state),)
+            )
+            revision = cur.fetchone()[0]
+            self._notify(cur, 'video', revision=revision, state=video_state)
+            return revision
+
+    def save_laser_flags(self, active=None):
+        """Toggle (active=True/False) or just clear (active=None) the laser. Returns (active, generation)"""
+        with self._cursor() as cur:
+            cur.execute(
+                "UPDATE presentation_state SET laser_active = COALESCE(%s, laser_active), laser_generation = laser_generation + 1 "
+                "WHERE id = 1 RETURNING laser_active, laser_generation",
+                (active,)
+            )
+            active, generation = cur.fetchone()
+            self._notify(cur, 'laser', active=active, generation=generation)
+            return active, generation
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'node': self.node_id,
+            'channel': self.channel,
+            'listening': self.connected,
+            'publish_to_apply': self.latency.stats()
+        }
+
+    def _catch_up(self, controller):
+        """Apply the stored state, covering anything announced while we were not listening"""
+        with self._cursor() as cur:
+            cur.execute("SELECT video, video_revision, laser_active, laser_generation FROM presentation_state WHERE id = 1")
+            video, video_revision, laser_active, laser_generation = cur.fetchone()
+        controller.apply_video_state(json.loads(video), video_revision)
+        controller.apply_laser_flags(laser_active, laser_generation)
+        controller.request_sync()
+
+    def _apply(self, controller, payload):
+        """Apply one announcement and record how long it took to get here"""
+        published_at = payload['published_at']
+        kind = payload['kind']
+        if kind == 'navigation':
+            if payload['revision'] == controller.store_revision:
+                self.latency.record(time.time() - published_at)
+                return
+            # Counts as applied once the writer has published the new snapshot
+            controller.request_sync().add_done_callback(lambda _: self.latency.record(time.time() - published_at))
+            return
+        if kind == 'video':
+            controller.apply_video_state(payload['state'], payload['revision'])
+        elif kind == 'laser':
+            controller.apply_laser_flags(payload['active'], payload['generation'])
+        self.latency.record(time.time() - published_at)
+
+    def _listen(self, controller):
+        """Apply every node's announcements to this node's controller, reconnecting on failure"""
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                self.connected = True
+                self._catch_up(controller)
+
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self._apply(controller, json.loads(notify.payload))
+                        except Exception as e:
+                            logger.error("Error applying state notification %s: %s", notify.payload, e)
+            except Exception as e:
+                logger.error("State listener lost its connection: %s", e)
+                self.connected = False
+                if conn is not None:
+                    conn.close()
+                time.sleep(1)
+
+def create_state_backend(kind, path=None, dsn=None, channel='presentation_state'):
+    """Build the backend named by STATE_BACKEND ('memory', 'sqlite' or 'postgres')"""
+    if kind == 'sqlite':
+        logger.info("🗄️ Sharing presentation state through SQLite at %s", path)
+        return SQLiteStateBackend(path)
+    if kind == 'postgres':
+        logger.info("🗄️ Sharing presentation state through Postgres channel %s", channel)
+        return PostgresStateBackend(dsn, channel)
+    if kind != 'memory':
+        raise ValueError(f"Unknown state backend: {kind}")
+    return InMemoryStateBackend()
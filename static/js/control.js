@@ -10,6 +10,7 @@ class ControlPanel {
         this.currentIndex = 0;
         this.totalSlides = 0;
         this.slidePreview = null;
+        this.etags = {};
 
         this.initEventListeners();
         this.loadSlides();
@@ -24,7 +25,7 @@ class ControlPanel {
 
     async loadSlides() {
         try {
-            const response = await fetch('/api/slides');
+            const response = await fetch('/api/slides/manifest');
             const data = await response.json();
 
             this.slides = data.slides;
@@ -40,16 +41,18 @@ class ControlPanel {
 
     async refreshSlideState() {
         try {
-            const response = await fetch('/api/slides');
-            const data = await response.json();
-
             // Only update if the server state actually changed
+            const data = await fetchIfChanged('/api/slides/manifest', this.etags);
+            if (!data) return;
+
             if (data.current_index !== this.currentIndex) {
                 console.log(`🔄 Server slide changed: ${this.currentIndex} → ${data.current_index}`);
-                this.currentIndex = data.current_index;
-                this.updateDisplay();
-                this.renderSlideList();
             }
+            this.slides = data.slides;
+            this.currentIndex = data.current_index;
+            this.totalSlides = data.total;
+            this.updateDisplay();
+            this.renderSlideList();
         } catch (error) {
             console.error('Error refreshing slide state:', error);
         }
@@ -141,10 +144,12 @@ class ControlPanel {
     }
 
     startPolling() {
-        // Poll every 2 seconds to sync with any external changes
-        setInterval(() => {
-            this.refreshSlideState();
-        }, 2000);
+        // Sync with external changes as they are pushed; poll every 2 seconds only as fallback
+        this.slideStream = new SlideStream(
+            () => this.refreshSlideState(),
+            () => this.refreshSlideState(),
+            2000
+        );
     }
 }
 
@@ -9,6 +9,13 @@ class PresentationController {
         this.pollCount = 0;
         this.laserOverlay = null;
 
+        // One /api/state request covers every poll this page makes
+        this.state = new StateSync({
+            slide: (section) => this.handleSlide(section.data),
+            counter: (section) => this.renderSlideCounter(section),
+            laser: (section) => this.applyLaserDelta(section)
+        });
+
         console.log('🔧 PresentationController starting - timestamp:', new Date().toISOString());
         console.log('🌐 User Agent:', navigator.userAgent);
         console.log('📍 Page URL:', window.location.href);
@@ -16,7 +23,6 @@ class PresentationController {
 
         this.initChart();
         this.initLaserOverlay();
-        this.loadCurrentSlide();
         this.startPolling();
     }
 
@@ -33,51 +39,50 @@ class PresentationController {
         console.log('✅ ECharts initialized');
     }
 
-    async loadCurrentSlide() {
+    handleSlide(slideData) {
         this.pollCount++;
         const timestamp = new Date().toISOString();
 
-        try {
-            console.log(`🔄 [${this.pollCount}] loadCurrentSlide() called at ${timestamp}`);
-
-            const response = await fetch('/api/current-slide');
-            const slideData = await response.json();
-
-            console.log(`📡 [${this.pollCount}] Server response:`, slideData);
-            console.log(`🆔 [${this.pollCount}] Current stored ID: "${this.currentSlideId}" | New ID: "${slideData.id}"`);
-            console.log(`📊 [${this.pollCount}] Current slide index logic: Old slide was unknown, new slide appears to be:`, slideData.title);
-
-            // Check if slide actually changed
-            const slideChanged = this.currentSlideId !== slideData.id;
-            console.log(`🔍 [${this.pollCount}] Slide changed?: ${slideChanged}`);
-
-            if (slideChanged) {
-                console.warn(`🚨 [${this.pollCount}] SLIDE CHANGE DETECTED! Old: "${this.currentSlideId}" → New: "${slideData.id}"`);
-                console.warn(`🎬 [${this.pollCount}] Rendering new slide: ${slideData.title}`);
-
-                this.currentSlideId = slideData.id;
-                this.currentSlide = slideData;
-                this.renderSlide(slideData);
-            } else {
-                console.log(`➡️ [${this.pollCount}] Same slide (${slideData.id}), updating counter only`);
-                this.updateSlideCounter();
-            }
-        } catch (error) {
-            console.error(`❌ [${this.pollCount}] Error loading slide:`, error);
+        console.log(`🔄 [${this.pollCount}] handleSlide() called at ${timestamp}`);
+        console.log(`📡 [${this.pollCount}] Server response:`, slideData);
+        console.log(`🆔 [${this.pollCount}] Current stored ID: "${this.currentSlideId}" | New ID: "${slideData.id}"`);
+
+        // Check if slide actually changed
+        const slideChanged = this.currentSlideId !== slideData.id;
+        console.log(`🔍 [${this.pollCount}] Slide changed?: ${slideChanged}`);
+
+        if (slideChanged) {
+            console.warn(`🚨 [${this.pollCount}] SLIDE CHANGE DETECTED! Old: "${this.currentSlideId}" → New: "${slideData.id}"`);
+            console.warn(`🎬 [${this.pollCount}] Rendering new slide: ${slideData.title}`);
+
+            this.currentSlideId = slideData.id;
+            this.currentSlide = slideData;
+            this.renderSlideLevel(slideData);
+        } else {
+            console.log(`➡️ [${this.pollCount}] Same slide (${slideData.id}), updating counter only`);
+            this.updateSlideCounter();
         }
     }
 
-    async updateSlideCounter() {
-        try {
-            const response = await fetch('/api/slides');
-            const data = await response.json();
-            const counterText = `${data.current_index + 1} / ${data.total}`;
+    updateSlideCounter() {
+        // Only returns the counter if it changed since the last one we got
+        this.state.poll(['counter']);
+    }
 
-            console.log(`📋 [${this.pollCount}] Counter update: "${counterText}" (server index: ${data.current_index})`);
-            this.slideCounter.textContent = counterText;
-        } catch (error) {
-            console.error(`❌ [${this.pollCount}] Error updating slide counter:`, error);
-        }
+    renderSlideCounter(data) {
+        const counterText = `${data.current_index + 1} / ${data.total}`;
+
+        console.log(`📋 [${this.pollCount}] Counter update: "${counterText}" (server index: ${data.current_index})`);
+        this.slideCounter.textContent = counterText;
+    }
+
+    async renderSlideLevel(slideData) {
+        // Large datasets: fetch the level of detail that fits the chart's width
+        const slide = await loadSlideLevel(slideData, this.chartContainer.clientWidth);
+        if (this.currentSlideId !== slide.id) return; // Moved on while the level loaded
+
+        this.currentSlide = slide;
+        this.renderSlide(slide);
     }
 
     renderSlide(slideData) {
@@ -446,59 +451,51 @@ class PresentationController {
         // Disable pointer events since this will be controlled remotely
         this.laserOverlay.container.style.pointerEvents = 'none';
 
-        // Start polling for laser updates
-        this.startLaserPolling();
+        // Laser deltas arrive over the slide stream (see startPolling)
+        this.laserGeneration = null;
     }
 
 
-    async pollLaserPoints() {
-        try {
-            const response = await fetch('/api/laser/points');
-            const data = await response.json();
-
-            if (data.points && data.points.length > 0) {
-                // Clear existing trails and add new ones
-                this.laserOverlay.laserTrails = [];
-
-                data.points.forEach(point => {
-                    // Scale coordinates from controller to presentation
-                    const presentationRect = this.laserOverlay.container.getBoundingClientRect();
-                    const scaleX = presentationRect.width / point.container_width;
-                    const scaleY = presentationRect.height / point.container_height;
-
-                    const scaledX = point.x * scaleX;
-                    const scaledY = point.y * scaleY;
-
-                    // Calculate fade based on age
-                    const age = Date.now() / 1000 - point.timestamp;
-                    const fadeFactor = Math.max(0, 1 - (age / 5)); // Fade over 5 seconds
-
-                    this.laserOverlay.addLaserPoint(scaledX, scaledY, point.intensity * fadeFactor);
-                });
-            } else {
-                // Clear laser trails if no points
-                this.laserOverlay.laserTrails = [];
-            }
-        } catch (error) {
-            console.error('Error polling laser points:', error);
+    applyLaserDelta(data) {
+        // Drop trails when the presenter cleared the laser or our cursor fell out of the buffer
+        if (data.reset || data.generation !== this.laserGeneration) {
+            this.laserOverlay.laserTrails = [];
         }
-    }
+        this.laserGeneration = data.generation;
+        this.state.record('laser', data.revision); // Deltas also arrive over the slide stream
+
+        const points = data.points;
+        if (!points || points.x.length === 0) return;
+
+        // Scale coordinates from controller to presentation
+        const presentationRect = this.laserOverlay.container.getBoundingClientRect();
+        const now = Date.now() / 1000;
 
-    startLaserPolling() {
-        // Poll laser points every 100ms for smooth updates
-        setInterval(() => {
-            this.pollLaserPoints();
-        }, 100);
+        for (let k = 0; k < points.x.length; k++) {
+            const [containerWidth, containerHeight] = points.strokes[points.s[k]];
+            const scaledX = points.x[k] * (presentationRect.width / containerWidth);
+            const scaledY = points.y[k] * (presentationRect.height / containerHeight);
+
+            // Calculate fade based on age
+            const age = now - points.t[k];
+            const fadeFactor = Math.max(0, 1 - (age / 5)); // Fade over 5 seconds
+
+            this.laserOverlay.addLaserPoint(scaledX, scaledY, points.i[k] * fadeFactor);
+        }
     }
 
     startPolling() {
-        console.log('🔄 Starting polling every 2 seconds for slide changes');
-        console.warn('⚠️ IMPORTANT: Polling is ONLY for sync - it should NEVER cause slides to change automatically');
-
-        setInterval(() => {
-            console.log(`⏰ Polling interval triggered (count: ${this.pollCount + 1})`);
-            this.loadCurrentSlide();
-        }, 2000);
+        console.log('📡 Subscribing to slide and laser stream (polling only as fallback)');
+        console.warn('⚠️ IMPORTANT: Updates are ONLY for sync - they should NEVER cause slides to change automatically');
+
+        // One stream carries slide and laser events. While it is down, poll every
+        // section every 100ms so the laser stays live
+        this.slideStream = new SlideStream(
+            (slideData) => this.handleSlide(slideData),
+            () => this.state.poll(),
+            100,
+            { onLaser: (data) => this.applyLaserDelta(data) }
+        );
     }
 }
 
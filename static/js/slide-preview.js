@@ -6,6 +6,10 @@ class SlidePreview {
         this.currentSlideData = null;
         this.laserOverlay = null;
         this.isLaserActive = false;
+        this.etags = {};
+        this.pendingLaserPoints = [];
+        this.laserFlushScheduled = false;
+        this.laserRequestInFlight = false;
 
         this.init();
     }
@@ -13,7 +17,6 @@ class SlidePreview {
     init() {
         this.createPreviewContainer();
         this.setupLaserOverlay();
-        this.loadCurrentSlide();
         this.startPolling();
     }
 
@@ -263,33 +266,53 @@ class SlidePreview {
             // Call original method to show locally
             originalAddLaserPoint(x, y, intensity);
 
-            // Send to server if laser is active
+            // Queue for the server if laser is active
             if (this.isLaserActive) {
-                this.sendLaserPoint(x, y, intensity);
+                this.queueLaserPoint(x, y, intensity);
             }
         };
     }
 
-    async sendLaserPoint(x, y, intensity) {
+    queueLaserPoint(x, y, intensity) {
+        this.pendingLaserPoints.push([x, y, intensity]);
+
+        // Send everything gathered during this animation frame in one request
+        if (!this.laserFlushScheduled) {
+            this.laserFlushScheduled = true;
+            requestAnimationFrame(() => this.flushLaserPoints());
+        }
+    }
+
+    async flushLaserPoints() {
+        this.laserFlushScheduled = false;
+
+        // Keep gathering while a batch is in flight; it is flushed when that one completes
+        if (this.laserRequestInFlight || this.pendingLaserPoints.length === 0) return;
+
+        const points = this.pendingLaserPoints.splice(0, 512); // Server batch limit
+        this.laserRequestInFlight = true;
+
         try {
             const containerRect = this.previewElement.querySelector('.preview-content').getBoundingClientRect();
 
-            await fetch('/api/laser/point', {
+            await fetch('/api/laser/batch', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    x: x,
-                    y: y,
-                    intensity: intensity,
                     container_width: containerRect.width,
                     container_height: containerRect.height,
-                    timestamp: Date.now()
+                    points: points
                 })
             });
         } catch (error) {
-            console.error('Error sending laser point:', error);
+            console.error('Error sending laser points:', error);
+        } finally {
+            this.laserRequestInFlight = false;
+            if (this.pendingLaserPoints.length > 0) {
+                this.flushLaserPoints();
+            }
         }
     }
 
@@ -309,6 +332,7 @@ class SlidePreview {
                 toggleBtn.classList.remove('active');
                 this.laserOverlay.container.style.pointerEvents = 'none';
                 this.laserOverlay.laserTrails = []; // Clear existing trails
+                this.pendingLaserPoints = [];
                 this.setLaserActiveOnServer(false);
                 this.clearLaserPointsOnServer();
             }
@@ -487,19 +511,33 @@ class SlidePreview {
 
     async loadCurrentSlide() {
         try {
-            const response = await fetch('/api/current-slide');
-            const slideData = await response.json();
-
-            // Only update if slide actually changed
-            if (!this.currentSlideData || this.currentSlideData.id !== slideData.id) {
-                this.currentSlideData = slideData;
-                this.renderSlide(slideData);
+            const slideData = await fetchIfChanged('/api/current-slide', this.etags);
+            if (slideData) {
+                this.handleSlide(slideData);
             }
         } catch (error) {
             console.error('Error loading current slide for preview:', error);
         }
     }
 
+    handleSlide(slideData) {
+        // Only update if slide actually changed
+        if (!this.currentSlideData || this.currentSlideData.id !== slideData.id) {
+            this.currentSlideData = slideData;
+            this.renderSlideLevel(slideData);
+        }
+    }
+
+    async renderSlideLevel(slideData) {
+        // The preview is small, so a coarse level of a large dataset is plenty
+        const width = this.chartInstance ? this.chartInstance.getWidth() : 0;
+        const slide = await loadSlideLevel(slideData, width);
+        if (this.currentSlideData.id !== slide.id) return; // Moved on while the level loaded
+
+        this.currentSlideData = slide;
+        this.renderSlide(slide);
+    }
+
     renderSlide(slideData) {
         const titleElement = this.previewElement.querySelector('#preview-title');
         titleElement.textContent = slideData.title;
@@ -626,13 +664,18 @@ class SlidePreview {
     }
 
     startPolling() {
-        // Poll every 3 seconds to stay in sync with presentation
-        setInterval(() => {
-            this.loadCurrentSlide();
-        }, 3000);
+        // Follow the slide change stream; poll every 3 seconds only while it is unavailable
+        this.slideStream = new SlideStream(
+            (slideData) => this.handleSlide(slideData),
+            () => this.loadCurrentSlide(),
+            3000
+        );
     }
 
     destroy() {
+        if (this.slideStream) {
+            this.slideStream.destroy();
+        }
         if (this.chartInstance) {
             this.chartInstance.dispose();
         }
@@ -0,0 +1,264 @@
+class SlideStream {
+    // options.onLaser: also receive laser deltas over the same stream (one connection per page)
+    // options.stallTimeout: ms without any event (heartbeats included) before the stream counts as dead
+    constructor(onSlide, fallbackPoll, fallbackInterval = 2000, options = {}) {
+        this.onSlide = onSlide;
+        this.onLaser = options.onLaser || null;
+        this.url = this.onLaser ? '/api/current-slide/stream?laser=1' : '/api/current-slide/stream';
+        this.fallbackPoll = fallbackPoll;
+        this.fallbackInterval = fallbackInterval;
+        this.stallTimeout = options.stallTimeout || 40000; // Server heartbeats every 15s
+        this.source = null;
+        this.fallbackTimer = null;
+        this.watchdogTimer = null;
+        this.reconnectTimer = null;
+        this.lastEvent = 0;
+
+        this.start();
+    }
+
+    start() {
+        // Browsers without EventSource keep the old polling behaviour
+        if (!window.EventSource) {
+            this.startFallback();
+            return;
+        }
+
+        this.source = new EventSource(this.url);
+        this.lastEvent = Date.now();
+
+        this.source.addEventListener('slide', (event) => {
+            this.lastEvent = Date.now();
+            try {
+                this.onSlide(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Error handling slide event:', error);
+            }
+        });
+
+        if (this.onLaser) {
+            this.source.addEventListener('laser', (event) => {
+                this.lastEvent = Date.now();
+                try {
+                    this.onLaser(JSON.parse(event.data));
+                } catch (error) {
+                    console.error('Error handling laser event:', error);
+                }
+            });
+        }
+
+        this.source.addEventListener('heartbeat', () => {
+            this.lastEvent = Date.now();
+        });
+
+        this.source.onopen = () => {
+            this.lastEvent = Date.now();
+            this.stopFallback();
+        };
+
+        this.source.onerror = () => {
+            // EventSource reconnects on its own; poll until it is back
+            this.startFallback();
+        };
+
+        // A server out of stream threads accepts the connection but never answers,
+        // which fires no error; treat silence as a dead stream
+        this.watchdogTimer = setInterval(() => {
+            if (Date.now() - this.lastEvent > this.stallTimeout) {
+                this.stall();
+            }
+        }, 5000);
+    }
+
+    stall() {
+        console.warn('📡 Slide stream stalled, polling until it can be reopened');
+        this.closeSource();
+        this.startFallback();
+        this.reconnectTimer = setTimeout(() => {
+            this.reconnectTimer = null;
+            this.start();
+        }, this.stallTimeout);
+    }
+
+    startFallback() {
+        if (this.fallbackTimer) return;
+
+        console.warn('📡 Slide stream unavailable, falling back to polling');
+        this.fallbackPoll();
+        this.fallbackTimer = setInterval(() => {
+            this.fallbackPoll();
+        }, this.fallbackInterval);
+    }
+
+    stopFallback() {
+        if (this.fallbackTimer) {
+            clearInterval(this.fallbackTimer);
+            this.fallbackTimer = null;
+        }
+    }
+
+    closeSource() {
+        if (this.watchdogTimer) {
+            clearInterval(this.watchdogTimer);
+            this.watchdogTimer = null;
+        }
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+
+    destroy() {
+        this.stopFallback();
+        this.closeSource();
+        if (this.reconnectTimer) {
+            clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = null;
+        }
+    }
+}
+
+// Conditional GET that remembers each URL's ETag in `etags`.
+// Resolves to null when the server answers 304 Not Modified.
+async function fetchIfChanged(url, etags) {
+    const headers = {};
+    if (etags[url]) {
+        headers['If-None-Match'] = etags[url];
+    }
+
+    const response = await fetch(url, { headers: headers });
+    if (response.status === 304) {
+        return null;
+    }
+
+    etags[url] = response.headers.get('ETag');
+    return response.json();
+}
+
+// Large line/scatter slides arrive with a default level of detail. Fetch the level
+// matching the chart's pixel width when that is a different one.
+async function loadSlideLevel(slide, width) {
+    const lod = slide.lod;
+    if (!lod) return slide;
+
+    const wanted = lod.widths.find((levelWidth) => levelWidth >= width) ?? null;
+    if (wanted === lod.default_width) return slide;
+
+    try {
+        const response = await fetch(`/api/slides/${encodeURIComponent(slide.id)}?width=${Math.ceil(width)}`);
+        if (!response.ok) return slide;
+        const detail = await response.json();
+        // Keep the live fields (sub-slide position) from the pushed slide
+        return Object.assign({}, slide, { data: detail.data });
+    } catch (error) {
+        console.error('Error loading slide detail:', error);
+        return slide;
+    }
+}
+
+// Polls the composite /api/state endpoint. It sends the revision held for every
+// section and hands each section that changed to its handler, so one request
+// covers slide, counter and laser state.
+class StateSync {
+    constructor(handlers = {}, url = '/api/state') {
+        this.url = url;
+        this.handlers = Object.assign({}, handlers);
+        this.revisions = {};
+        this.timer = null;
+        this.running = false;
+        this.inFlight = null;
+    }
+
+    on(section, handler) {
+        this.handlers[section] = handler;
+    }
+
+    // For state that arrived some other way (e.g. a push stream)
+    record(section, revision) {
+        this.revisions[section] = revision;
+    }
+
+    poll(sections = Object.keys(this.handlers)) {
+        // Never overlap requests; a slow response would otherwise be applied out of order
+        if (!this.inFlight) {
+            this.inFlight = this.fetchState(sections).finally(() => {
+                this.inFlight = null;
+            });
+        }
+        return this.inFlight;
+    }
+
+    async fetchState(sections) {
+        const params = new URLSearchParams({ sections: sections.join(',') });
+        for (const section of sections) {
+            if (this.revisions[section] !== undefined) {
+                params.set(section, this.revisions[section]);
+            }
+        }
+
+        try {
+            const response = await fetch(`${this.url}?${params}`);
+            if (!response.ok) return;
+
+            const state = await response.json();
+            for (const [section, data] of Object.entries(state)) {
+                this.revisions[section] = data.revision;
+                if (this.handlers[section]) {
+                    this.handlers[section](data);
+                }
+            }
+        } catch (error) {
+            console.error('Error polling state:', error);
+        }
+    }
+
+    start(interval) {
+        this.stop();
+        this.running = true;
+        const tick = async () => {
+            await this.poll();
+            if (this.running) {
+                this.timer = setTimeout(tick, interval);
+            }
+        };
+        tick();
+    }
+
+    stop() {
+        this.running = false;
+        if (this.timer) {
+            clearTimeout(this.timer);
+            this.timer = null;
+        }
+    }
+}
+
+// Keeps the short-lived viewer ticket cookie fresh. Audience endpoints accept the
+// ticket without a session lookup, so long-lived pages must renew it before expiry.
+class ViewerTicketRefresher {
+    constructor() {
+        this.timer = null;
+        this.refresh();
+    }
+
+    async refresh() {
+        let delay = 60000; // Retry in a minute if the refresh fails
+        try {
+            const response = await fetch('/api/viewer-ticket', { method: 'POST' });
+            if (response.ok) {
+                const data = await response.json();
+                delay = data.expires_in * 1000 / 2;
+            }
+        } catch (error) {
+            console.error('Error refreshing viewer ticket:', error);
+        }
+        this.timer = setTimeout(() => this.refresh(), delay);
+    }
+}
+
+// Export for use in other scripts
+window.SlideStream = SlideStream;
+window.fetchIfChanged = fetchIfChanged;
+window.loadSlideLevel = loadSlideLevel;
+window.StateSync = StateSync;
+window.viewerTicketRefresher = window.viewerTicketRefresher || new ViewerTicketRefresher();
@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# The app reads its configuration from the environment at import time and creates its
+# upload directories relative to the working directory, so both are set up first
+WORKDIR = tempfile.mkdtemp(prefix='claude_maze_tests_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(WORKDIR, 'test.db')}")
+os.chdir(WORKDIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def app_module():
+    # The schema comes from the migrations, as in production; the app opens its deck at import
+    from init_db import upgrade_database
+    upgrade_database()
+    import app as app_module
+    return app_module
+
+@pytest.fixture(scope='session')
+def organization(app_module):
+    from models import db, Organization
+    with app_module.app.app_context():
+        organization = Organization(name='Test Organization', seat_limit=5)
+        db.session.add(organization)
+        db.session.commit()
+        return organization.id
+
+@pytest.fixture(scope='session')
+def admin_user(app_module, organization):
+    from models import db, User
+    with app_module.app.app_context():
+        user = User(username='test-admin', role='admin', organization_id=organization)
+        user.set_password('admin123')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+@pytest.fixture
+def admin_client(app_module, admin_user):
+    """Factory for test clients logged in as the admin (one per thread; clients are not thread-safe)"""
+    from models import db, UserSession
+    with app_module.app.app_context():
+        user_session = UserSession.create_session(admin_user)
+        db.session.add(user_session)
+        db.session.commit()
+        token = user_session.session_token
+
+    def make_client():
+        client = app_module.app.test_client()
+        with client.session_transaction() as session:
+            session['session_token'] = token
+        return client
+    return make_client
+
+@pytest.fixture
+def viewer_client(app_module, admin_user):
+    """Factory for test clients holding only a viewer ticket"""
+    from auth import issue_viewer_ticket, VIEWER_TICKET_COOKIE
+    from models import db, User
+    with app_module.app.app_context():
+        ticket = issue_viewer_ticket(db.session.get(User, admin_user))
+
+    def make_client():
+        client = app_module.app.test_client()
+        client.set_cookie(VIEWER_TICKET_COOKIE, ticket)
+        return client
+    return make_client
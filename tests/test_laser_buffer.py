@@ -0,0 +1,42 @@
+from laser_buffer import LaserRingBuffer
+
+def test_wraparound_keeps_the_newest_points_in_order():
+    buffer = LaserRingBuffer(capacity=4, max_age=60)
+    for i in range(10):
+        buffer.append(i, -i, 1.0, 800, 600, timestamp=1000 + i)
+
+    assert len(buffer) == 4
+    assert (buffer.head, buffer.tail) == (6, 10)
+    points = buffer.points_since()
+    assert [point['seq'] for point in points] == [6, 7, 8, 9]
+    assert [(point['x'], point['y']) for point in points] == [(6, -6), (7, -7), (8, -8), (9, -9)]
+    assert buffer.packed_since(8)['x'] == [8, 9]
+
+def test_covers_only_cursors_inside_the_live_window():
+    buffer = LaserRingBuffer(capacity=4, max_age=60)
+    for i in range(6):
+        buffer.append(i, i, 1.0, 800, 600, timestamp=1000 + i)
+
+    assert not buffer.covers(None)
+    assert not buffer.covers(1)  # Overwritten
+    assert buffer.covers(2)
+    assert buffer.covers(6)  # Caught up: an empty delta is complete
+    assert not buffer.covers(7)
+
+    # A cursor that fell out of the window gets every live point, not a partial delta
+    assert [point['seq'] for point in buffer.points_since(1)] == [2, 3, 4, 5]
+
+def test_expiry_and_strokes():
+    buffer = LaserRingBuffer(capacity=8, max_age=5)
+    buffer.append(0, 0, 1.0, 800, 600, timestamp=100)
+    buffer.append(1, 1, 1.0, 1024, 768, timestamp=103)
+    buffer.append(2, 2, 1.0, 1024, 768, timestamp=104)
+
+    buffer.expire(now=106)
+    assert [point['seq'] for point in buffer.points_since()] == [1, 2]
+    assert list(buffer.strokes.values()) == [(1024, 768)]
+    assert buffer.packed_since()['strokes'] == {1: (1024, 768)}
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.covers(3)
@@ -0,0 +1,56 @@
+import numpy as np
+from lod import lttb, bin_scatter, build_lod, select_level
+
+def test_lttb_keeps_threshold_points_and_both_ends():
+    y = np.sin(np.linspace(0, 20, 10000))
+    keep = lttb(y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert (np.diff(keep) > 0).all()  # In order, no repeats
+
+def test_lttb_keeps_spikes():
+    y = np.zeros(1000)
+    y[437] = 100
+    assert 437 in lttb(y, 50)
+
+def test_lttb_leaves_small_series_alone():
+    assert list(lttb([1, 2, 3], 10)) == [0, 1, 2]
+
+def test_lttb_ignores_missing_values_when_choosing():
+    y = np.arange(1000, dtype='float64')
+    y[::7] = np.nan
+    keep = lttb(y, 100)
+    assert len(keep) == 100 and keep[-1] == 999
+
+def test_bin_scatter_counts_every_point_once():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(20000, 2))
+    binned = bin_scatter(points.tolist(), 50)
+    assert len(binned) <= 50 * 50
+    assert sum(count for _, _, count in binned) == len(points)
+
+    # Centroids stay inside the data's range, so the plot keeps its extent
+    xs = [x for x, _, _ in binned]
+    assert points[:, 0].min() <= min(xs) and max(xs) <= points[:, 0].max()
+
+def test_bin_scatter_single_column_of_points():
+    binned = bin_scatter([[1.0, y] for y in range(100)], 10)
+    assert len(binned) == 10
+    assert all(x == 1.0 for x, _, _ in binned)
+
+def test_build_lod_levels_for_large_line_series():
+    n = 50000
+    data = {'xAxis': [str(i) for i in range(n)], 'series': list(range(n))}
+    default, lod = build_lod('line', data)
+
+    assert lod['points'] == n
+    assert [level['width'] for level in lod['levels']] == [500, 1000, 2000, 4000, None]
+    assert lod['default_width'] == 2000 and len(default['series']) == 2000
+    assert default['xAxis'][0] == '0' and default['xAxis'][-1] == str(n - 1)
+    assert select_level(lod['levels'], 700)['width'] == 1000
+    assert select_level(lod['levels'], 8000)['width'] is None
+
+def test_build_lod_leaves_small_and_other_charts_alone():
+    data = {'xAxis': ['a', 'b'], 'series': [1, 2]}
+    assert build_lod('line', data) == (data, None)
+    assert build_lod('pie', [{'name': 'a', 'value': 1}]) == ([{'name': 'a', 'value': 1}], None)
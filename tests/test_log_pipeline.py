@@ -0,0 +1,15 @@
+import logging
+
+def test_access_log_times_the_whole_request(app_module, caplog):
+    # The timer runs before authentication, which is part of what a request costs
+    assert app_module.app.before_request_funcs[None][0].__name__ == 'start_request_timer'
+
+    client = app_module.app.test_client()
+    with caplog.at_level(logging.INFO, logger='app.access'):
+        response = client.post('/api/upload/chunked', json={})
+    assert response.status_code == 401
+
+    record, = [r for r in caplog.records if r.name == 'app.access']
+    assert record.getMessage() == 'POST /api/upload/chunked 401'
+    assert record.fields['endpoint'] == 'start_chunked_upload'
+    assert record.fields['duration_ms'] is not None
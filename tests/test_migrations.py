@@ -0,0 +1,10 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+def test_migrations_match_the_models(app_module):
+    """The migrated database has every table and index the models declare"""
+    from models import db
+    with app_module.app.app_context():
+        with db.engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), db.metadata)
+    assert diff == []
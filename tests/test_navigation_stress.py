@@ -0,0 +1,108 @@
+import random
+import threading
+
+NAVIGATORS = 8
+POLLERS = 8
+COMMANDS_PER_NAVIGATOR = 40
+
+def etag_revision(response):
+    """Revision number of an '<epoch>-<revision>' ETag"""
+    etag, _ = response.get_etag()
+    return int(etag.rsplit('-', 1)[1])
+
+def run_stress(app_module, admin_client, viewer_client, commands):
+    """Navigate from NAVIGATORS threads while POLLERS threads poll /api/current-slide.
+
+    `commands(rng)` picks each navigation path. Returns the errors seen and the paths issued.
+    """
+    slide_ids = {slide['id'] for slide in app_module.slide_controller.slides}
+    errors = []
+    issued = []
+    navigating = threading.Event()
+    navigating.set()
+
+    def navigate(seed):
+        client = admin_client()
+        rng = random.Random(seed)
+        for _ in range(COMMANDS_PER_NAVIGATOR):
+            path = commands(rng)
+            response = client.get(path)
+            if response.status_code != 200:
+                errors.append(f"{path}: {response.status_code}")
+            elif response.get_json()['id'] not in slide_ids:
+                errors.append(f"{path}: unknown slide {response.get_json()['id']}")
+            issued.append(path)
+
+    def poll():
+        client = viewer_client()
+        etag, revision = None, -1
+        while navigating.is_set():
+            headers = {'If-None-Match': f'"{etag}"'} if etag else {}
+            response = client.get('/api/current-slide', headers=headers)
+            if response.status_code not in (200, 304):
+                errors.append(f"poll: {response.status_code}")
+                return
+            if response.status_code == 200 and response.get_json()['id'] not in slide_ids:
+                errors.append(f"poll: unknown slide {response.get_json()['id']}")
+            latest = etag_revision(response)
+            if latest < revision:
+                errors.append(f"poll: ETag went back from revision {revision} to {latest}")
+            etag, revision = response.get_etag()[0], latest
+
+    navigators = [threading.Thread(target=navigate, args=(seed,)) for seed in range(NAVIGATORS)]
+    pollers = [threading.Thread(target=poll) for _ in range(POLLERS)]
+    for thread in pollers + navigators:
+        thread.start()
+    for thread in navigators:
+        thread.join()
+    navigating.clear()
+    for thread in pollers:
+        thread.join()
+    return errors, issued
+
+def assert_published(app_module, client):
+    """The published snapshot, and what clients get, match the writer's state"""
+    controller = app_module.slide_controller
+    snapshot = controller.snapshot
+    assert controller.commands.empty()
+    assert snapshot.current_index == controller.current_slide
+    assert snapshot.revision == controller.revision
+
+    response = client.get('/api/current-slide')
+    assert response.status_code == 200
+    assert response.get_etag()[0] == snapshot.etag
+    assert response.get_json()['id'] == controller.slides[controller.current_slide]['id']
+    assert response.get_json()['current_sub_slide'] == controller.current_sub_slide
+
+def test_concurrent_navigation_and_polling(app_module, admin_client, viewer_client):
+    total = len(app_module.slide_controller.slides)
+
+    def command(rng):
+        return rng.choice([
+            '/api/next-slide',
+            '/api/previous-slide',
+            f'/api/goto-slide/{rng.randrange(total)}',
+            '/api/next-sub-slide',
+            '/api/previous-sub-slide'
+        ])
+
+    errors, issued = run_stress(app_module, admin_client, viewer_client, command)
+    assert errors == []
+    assert len(issued) == NAVIGATORS * COMMANDS_PER_NAVIGATOR
+    assert_published(app_module, viewer_client())
+
+def test_no_navigation_is_lost(app_module, admin_client, viewer_client):
+    controller = app_module.slide_controller
+    total = len(controller.slides)
+    assert admin_client().get('/api/goto-slide/0').status_code == 200
+
+    errors, issued = run_stress(
+        app_module, admin_client, viewer_client,
+        lambda rng: rng.choice(['/api/next-slide', '/api/previous-slide'])
+    )
+    assert errors == []
+
+    # Both wrap around the deck, so only the difference between them decides where it ends
+    steps = issued.count('/api/next-slide') - issued.count('/api/previous-slide')
+    assert controller.current_slide == steps % total
+    assert_published(app_module, viewer_client())
@@ -0,0 +1,133 @@
+"""PostgresStateBackend against a real server: set TEST_POSTGRES_DSN (e.g. postgresql://localhost/claude_maze_test)
+to run. Each test works in a scratch schema and NOTIFY channel of its own."""
+import json
+import os
+import threading
+import time
+import uuid
+import pytest
+
+DSN = os.environ.get('TEST_POSTGRES_DSN')
+pytestmark = pytest.mark.skipif(not DSN, reason='TEST_POSTGRES_DSN is not set')
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+@pytest.fixture
+def postgres(app_module):
+    """Returns a factory for controllers sharing one scratch schema and channel, plus an admin connection"""
+    import psycopg2
+    import psycopg2.extensions
+    from state_backend import PostgresStateBackend
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(DSN)
+    admin.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    admin.cursor().execute(f'CREATE SCHEMA "{schema}"')
+    controllers = []
+
+    def make_controller(name, max_connections=4):
+        # application_name tells each node's listener connection apart in pg_stat_activity
+        dsn = psycopg2.extensions.make_dsn(DSN, options=f'-c search_path={schema}', application_name=f'{schema}-{name}')
+        controller = app_module.SlideController(PostgresStateBackend(dsn, channel=schema, max_connections=max_connections))
+        assert wait_until(lambda: controller.backend.connected)
+        controllers.append(controller)
+        return controller
+
+    yield make_controller, admin, schema
+    for controller in controllers:
+        controller.close()
+        controller.backend.pool.closeall()
+    admin.cursor().execute(f'DROP SCHEMA "{schema}" CASCADE')
+    admin.close()
+
+def test_notifications_reach_the_other_node(postgres):
+    make_controller, _, _ = postgres
+    first, second = make_controller('first'), make_controller('second')
+
+    first.next_slide()
+    assert wait_until(lambda: second.snapshot.current_index == 1)
+    first.set_video_stream('youtube', 'https://www.youtube.com/embed/abc')
+    assert wait_until(lambda: second.get_video_state()['url'] == 'https://www.youtube.com/embed/abc')
+    first.set_laser_active(True)
+    assert wait_until(lambda: second.get_laser_points()['active'])
+    assert second.laser_generation == first.laser_generation
+
+    # Every announcement applied was timed from publish to apply
+    latency = second.backend.stats()['publish_to_apply']
+    assert latency['count'] >= 3
+    assert latency['avg_ms'] is not None and latency['max_ms'] >= latency['avg_ms']
+
+def test_catch_up_after_reconnect(postgres):
+    make_controller, admin, schema = postgres
+    first, second = make_controller('first'), make_controller('second')
+
+    cur = admin.cursor()
+    cur.execute(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = %s AND query LIKE 'LISTEN%%'",
+        (f'{schema}-second',)
+    )
+    assert cur.fetchone()[0]
+    assert wait_until(lambda: not second.backend.connected)
+
+    # Announced while the second node is not listening; only _catch_up can bring these over
+    first.goto_slide(3)
+    first.set_video_stream('vimeo', 'https://player.vimeo.com/video/1')
+    first.set_laser_active(True)
+
+    assert wait_until(lambda: second.backend.connected)
+    assert wait_until(lambda: second.snapshot.current_index == 3)
+    assert second.get_video_state()['type'] == 'vimeo'
+    assert second.get_laser_points()['active']
+
+def test_out_of_order_notifications_are_ignored(postgres):
+    make_controller, admin, schema = postgres
+    node = make_controller('node')
+
+    def announce(kind, **payload):
+        payload.update(kind=kind, node='test', published_at=time.time())
+        admin.cursor().execute("SELECT pg_notify(%s, %s)", (schema, json.dumps(payload)))
+
+    newer = {'active': True, 'type': 'youtube', 'url': 'newer', 'room_id': ''}
+    older = {'active': True, 'type': 'youtube', 'url': 'older', 'room_id': ''}
+    announce('video', revision=10, state=newer)
+    announce('laser', active=True, generation=10)
+    assert wait_until(lambda: node.get_laser_points()['generation'] == 10)
+
+    announce('video', revision=9, state=older)
+    announce('laser', active=False, generation=9)
+    announce('laser', active=True, generation=11)  # Marker: everything before it was applied
+    assert wait_until(lambda: node.get_laser_points()['generation'] == 11)
+    assert node.get_video_state()['url'] == 'newer'
+
+def test_writer_transaction_and_other_writes_share_a_small_pool(postgres):
+    make_controller, _, _ = postgres
+    # Navigation holds one connection for its transaction while video and laser writes take others
+    node = make_controller('node', max_connections=2)
+    errors = []
+
+    def hammer(action):
+        try:
+            for _ in range(10):
+                action()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=hammer, args=(node.next_slide,)),
+        threading.Thread(target=hammer, args=(lambda: node.set_video_stream('youtube', 'u'),)),
+        threading.Thread(target=hammer, args=(node.clear_laser_points,)),
+        threading.Thread(target=hammer, args=(lambda: node.backend._catch_up(node),))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not errors
+    assert not any(thread.is_alive() for thread in threads)
+    assert node.snapshot.current_index == 10 % node.snapshot.total
@@ -0,0 +1,39 @@
+import time
+from provisioning import validate_rows
+
+def test_failed_row_does_not_mark_its_username_taken():
+    results = validate_rows([
+        {'username': 'alice', 'password': 'short'},
+        {'username': 'alice', 'password': 'long enough'},
+        {'username': 'alice', 'password': 'also long enough'}
+    ])
+    assert [result['error'] for result, _ in results] == [
+        'Password must be at least 6 characters long',
+        None,
+        'Username appears more than once in the file'
+    ]
+
+def test_non_object_json_body_is_rejected(app_module, admin_client):
+    client = admin_client()
+    response = client.post('/api/users/bulk', json=[{'username': 'bob', 'password': 'password1'}])
+    assert response.status_code == 400
+
+def test_bulk_import_runs_as_a_polled_job(app_module, admin_client, organization):
+    client = admin_client()
+    users = [{'username': f'bulk-{i}', 'password': 'password1'} for i in range(5)]
+    users.append({'username': 'bulk-0', 'password': 'password1'})
+    response = client.post('/api/users/bulk', json={'users': users})
+    assert response.status_code == 202
+    status_url = response.get_json()['status_url']
+
+    deadline = time.monotonic() + 120
+    while True:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'error') or time.monotonic() > deadline:
+            break
+        time.sleep(0.1)
+
+    assert job['status'] == 'done', job
+    assert (job['created'], job['failed'], job['hashed']) == (5, 1, 5)
+    assert job['results'][-1]['error'] == 'Username appears more than once in the file'
+    assert client.get('/api/users/bulk/jobs/unknown').status_code == 404
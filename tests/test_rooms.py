@@ -0,0 +1,43 @@
+import time
+
+def test_reading_an_unopened_room_is_not_found(viewer_client):
+    client = viewer_client()
+    assert client.get('/api/rooms/never-opened/current-slide').status_code == 404
+    assert client.get('/api/rooms/never-opened/state').status_code == 404
+
+def test_admin_write_opens_room_for_viewers(app_module, organization, admin_client, viewer_client):
+    opened = app_module.rooms.stats()['rooms']
+    assert admin_client().get('/api/rooms/quarterly/next-slide').status_code == 200
+    assert app_module.rooms.stats()['rooms'] == opened + 1
+
+    response = viewer_client().get('/api/rooms/quarterly/current-slide')
+    assert response.status_code == 200
+    assert response.get_json()['id'] == app_module.rooms.get((organization, 'quarterly'), create=False).slides[1]['id']
+
+def test_idle_rooms_are_closed_outside_the_stripe_lock():
+    from rooms import RoomRegistry
+
+    class Room:
+        def __init__(self, registry, key):
+            self.registry, self.key = registry, key
+            self.last_access = time.monotonic()
+            self.closed_with_lock_free = None
+
+        def touch(self):
+            self.last_access = time.monotonic()
+
+        def close(self):
+            _, _, lock = self.registry._stripe(self.key)
+            self.closed_with_lock_free = lock.acquire(blocking=False)
+            if self.closed_with_lock_free:
+                lock.release()
+
+    registry = RoomRegistry(lambda key: Room(registry, key), stripes=1, idle_timeout=10)
+    idle, busy = registry.get('idle'), registry.get('busy')
+    idle.last_access -= 60
+
+    assert registry.evict_idle() == 1
+    assert idle.closed_with_lock_free is True
+    assert registry.get('idle', create=False) is None
+    assert registry.get('busy', create=False) is busy
+    assert registry.stats()['rooms'] == 1
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from auth import SessionCache, session_cache, sweep_expired_sessions
+from models import db, User, UserSession
+
+def test_sweep_drops_swept_tokens_from_session_cache(app_module, admin_user):
+    with app_module.app.app_context():
+        user = db.session.get(User, admin_user)
+        user_session = UserSession.create_session(user.id)
+        user_session.expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.add(user_session)
+        db.session.commit()
+        token = user_session.session_token
+
+        # Cached while it was still valid
+        session_cache.put(token, user, datetime.utcnow() + timedelta(hours=1))
+        deleted, _, _ = sweep_expired_sessions()
+
+        assert deleted >= 1
+        assert session_cache.get(token) is None
+        assert db.session.execute(db.select(UserSession).filter_by(session_token=token)).first() is None
+
+def test_session_cache_entries_expire_after_ttl(monkeypatch):
+    cache = SessionCache(ttl=60)
+    user = User(id=1, username='cached', role='standard', organization_id=1)
+    now = [1000.0]
+    monkeypatch.setattr('auth.time.monotonic', lambda: now[0])
+
+    cache.put('token', user, datetime.utcnow() + timedelta(hours=1))
+    assert cache.get('token').username == 'cached'
+    now[0] += 61
+    assert cache.get('token') is None
+    assert cache.stats()['size'] == 0
+
+def test_session_cache_honours_session_expiry():
+    cache = SessionCache(ttl=60)
+    user = User(id=1, username='cached', role='standard', organization_id=1)
+    cache.put('token', user, datetime.utcnow() - timedelta(seconds=1))
+    assert cache.get('token') is None
+
+def test_logout_invalidates_the_cached_session(app_module, admin_client):
+    client = admin_client()
+    with client.session_transaction() as session:
+        token = session['session_token']
+
+    assert client.get('/api/auth/session-cache').status_code == 200
+    assert session_cache.get(token) is not None
+
+    client.get('/logout')
+    assert session_cache.get(token) is None
+    with client.session_transaction() as session:
+        session['session_token'] = token  # Replaying the old cookie
+    assert client.get('/api/auth/session-cache').status_code == 302
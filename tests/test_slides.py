@@ -0,0 +1,24 @@
+def test_slide_not_modified_skips_encoding(app_module, viewer_client, monkeypatch):
+    client = viewer_client()
+    response = client.get('/api/slides/bar_chart')
+    assert response.status_code == 200
+    assert response.get_json()['id'] == 'bar_chart'
+    etag = response.get_etag()[0]
+
+    def fail(*args):
+        raise AssertionError("slide encoded for a 304")
+    monkeypatch.setattr(app_module.slide_controller, 'get_slide_json', fail)
+    response = client.get('/api/slides/bar_chart', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_unknown_slide_is_not_found(viewer_client):
+    assert viewer_client().get('/api/slides/no_such_slide').status_code == 404
+
+def test_state_returns_only_changed_sections(viewer_client):
+    client = viewer_client()
+    state = client.get('/api/state').get_json()
+    assert set(state) == {'slide', 'counter', 'laser'}
+
+    held = {section: data['revision'] for section, data in state.items()}
+    assert client.get('/api/state', query_string=held).get_json() == {}
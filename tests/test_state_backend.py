@@ -0,0 +1,74 @@
+import os
+import time
+import pytest
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+@pytest.fixture
+def sqlite_controllers(app_module, tmp_path):
+    """Two controllers sharing one SQLite state file, as two gunicorn workers would"""
+    from state_backend import SQLiteStateBackend
+    path = os.path.join(tmp_path, 'state.db')
+    controllers = [app_module.SlideController(SQLiteStateBackend(path)) for _ in range(2)]
+    yield controllers
+    for controller in controllers:
+        controller.close()
+
+def test_sqlite_navigation_reaches_the_other_worker(sqlite_controllers):
+    first, second = sqlite_controllers
+    first.next_slide()
+    first.next_slide()
+    assert wait_until(lambda: second.snapshot.current_index == 2)
+
+    second.previous_slide()
+    assert wait_until(lambda: first.snapshot.current_index == 1)
+    assert first.snapshot.slide_json == second.snapshot.slide_json
+
+def test_sqlite_video_reaches_the_other_worker(sqlite_controllers):
+    first, second = sqlite_controllers
+    first.set_video_stream('youtube', 'https://www.youtube.com/embed/abc')
+    assert wait_until(lambda: second.get_video_state()['type'] == 'youtube')
+    assert second.get_video_state()['url'] == 'https://www.youtube.com/embed/abc'
+
+def test_sqlite_laser_reaches_the_other_worker(sqlite_controllers):
+    first, second = sqlite_controllers
+    first.set_laser_active(True)
+    first.add_laser_points([(0.1, 0.2, 1.0), (0.3, 0.4, 1.0)], 800, 600)
+    assert wait_until(lambda: len(second.get_laser_points()['points']) == 2)
+    state = second.get_laser_points(packed=True)
+    assert state['active'] and state['points']['x'] == [0.1, 0.3]
+
+    # Cleared through the second worker: the first drops its points too
+    second.clear_laser_points()
+    assert wait_until(lambda: first.get_laser_points()['points'] == [])
+    assert first.laser_generation == second.laser_generation
+
+def test_sqlite_added_slides_come_from_the_shared_deck(app_module, tmp_path):
+    """Backends keep navigation only; the other worker reads added slides from the database deck"""
+    from deck_store import SQLDeckStore, PayloadCache
+    from state_backend import SQLiteStateBackend
+    path = os.path.join(tmp_path, 'state.db')
+    controllers = []
+    for _ in range(2):
+        deck = SQLDeckStore(app_module.app, PayloadCache(1024 * 1024), f"shared-{tmp_path.name}")
+        deck.open()
+        controllers.append(app_module.SlideController(SQLiteStateBackend(path), deck))
+    first, second = controllers
+    try:
+        total = len(first.slides)
+        first.add_slide({'id': 'shared-chart', 'title': 'Shared', 'chart_type': 'bar', 'data': {'xAxis': ['a'], 'series': [1]}})
+        assert wait_until(lambda: len(second.slides) == total + 1)
+
+        second.goto_slide(total)
+        assert wait_until(lambda: first.snapshot.current_index == total)
+        assert first.get_current_slide()['title'] == 'Shared'
+        assert first.get_current_slide()['data'] == {'xAxis': ['a'], 'series': [1]}
+    finally:
+        for controller in controllers:
+            controller.close()
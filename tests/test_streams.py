@@ -0,0 +1,51 @@
+import threading
+from models import db, UserSession
+
+def session_client(app_module, user_id):
+    """Test client with a session of its own, so its first request misses the session cache"""
+    with app_module.app.app_context():
+        user_session = UserSession.create_session(user_id)
+        db.session.add(user_session)
+        db.session.commit()
+        token = user_session.session_token
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session['session_token'] = token
+    return client
+
+def test_streams_do_not_hold_database_connections(app_module, admin_user):
+    with app_module.app.app_context():
+        pool = db.engine.pool
+        streams = pool.size() + pool._max_overflow + 5
+
+    opened = threading.Semaphore(0)
+    release = threading.Event()
+    errors = []
+    clients = [session_client(app_module, admin_user) for _ in range(streams)]
+
+    def watch(client):
+        try:
+            response = client.get('/api/current-slide/stream', buffered=False)
+            assert response.status_code == 200
+            assert next(iter(response.response)).startswith(b'retry:')
+        except Exception as e:
+            errors.append(e)
+            return
+        finally:
+            opened.release()
+        release.wait()
+        response.close()
+
+    # One thread per stream, as under gunicorn's threaded workers
+    threads = [threading.Thread(target=watch, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    try:
+        assert all(opened.acquire(timeout=10) for _ in threads), 'streams blocked waiting for a connection'
+        assert not errors
+        with app_module.app.app_context():
+            assert db.engine.pool.checkedout() == 0
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,150 @@
+import time
+import pytest
+
+def wait_for_job(jobs, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = jobs.status(job_id)
+        if job['status'] in ('done', 'error') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+@pytest.fixture
+def upload_jobs(app_module, tmp_path):
+    from state_backend import InMemoryStateBackend
+    from uploads import UploadJobs
+    # The app's store: slides read their data back from it
+    jobs = UploadJobs(app_module.dataset_store, pool_size=1)
+    controller = app_module.SlideController(InMemoryStateBackend())
+    yield jobs, controller
+    controller.close()
+    if jobs.pool is not None:
+        jobs.pool.shutdown()
+
+def save_csv(tmp_path, name, rows=100):
+    path = tmp_path / name
+    path.write_text('day,visits\n' + ''.join(f'd{i},{i}\n' for i in range(rows)))
+    return str(path)
+
+def test_upload_job_hashes_in_the_pool_and_deduplicates(upload_jobs, tmp_path, monkeypatch):
+    from datasets import DatasetStore
+    jobs, controller = upload_jobs
+
+    # The request thread must not hash the upload; only the pool process may
+    def no_digest_here(*args, **kwargs):
+        raise AssertionError('upload hashed in the request thread')
+    monkeypatch.setattr(DatasetStore, 'digest', staticmethod(no_digest_here))
+
+    slides = len(controller.slides)
+    first = wait_for_job(jobs, jobs.submit(controller, save_csv(tmp_path, 'a.csv'), 'line',
+                                           {'id': 'custom_a', 'title': 'A', 'chart_type': 'line'}))
+    second = wait_for_job(jobs, jobs.submit(controller, save_csv(tmp_path, 'b.csv'), 'line',
+                                            {'id': 'custom_b', 'title': 'B', 'chart_type': 'line'}))
+
+    assert first['status'] == 'done' and not first['deduplicated']
+    assert second['status'] == 'done' and second['deduplicated']
+    assert first['dataset'] == second['dataset']
+    assert len(controller.slides) == slides + 2
+    assert not (tmp_path / 'a.csv').exists() and not (tmp_path / 'b.csv').exists()
+
+def test_upload_job_reports_processing_errors(upload_jobs, tmp_path):
+    jobs, controller = upload_jobs
+    path = tmp_path / 'one-column.csv'
+    path.write_text('x\n1\n2\n')
+    job = wait_for_job(jobs, jobs.submit(controller, str(path), 'scatter',
+                                         {'id': 'custom_c', 'title': 'C', 'chart_type': 'scatter'}))
+    assert job['status'] == 'error' and 'Scatter plot requires at least 2 columns' in job['error']
+    assert job['dataset'] is None
+
+@pytest.mark.parametrize('chart_type', ['bar', 'pie', 'line'])
+def test_uploaded_slides_keep_their_data_in_the_dataset_store(app_module, upload_jobs, tmp_path, chart_type):
+    import json
+    jobs, controller = upload_jobs
+    path = tmp_path / f'{chart_type}.csv'
+    path.write_text('label,value\n' + ''.join(f'{chart_type}{i},{i}\n' for i in range(50)))
+    job = wait_for_job(jobs, jobs.submit(controller, str(path), chart_type,
+                                         {'id': f'custom_{chart_type}', 'title': 'T', 'chart_type': chart_type}))
+    assert job['status'] == 'done', job
+
+    # Only a reference stays in the deck; the data is read (and cached) when the slide is served
+    slide = controller.slides[-1]
+    assert 'data' not in slide and slide['dataset'] == job['dataset']
+    body = controller.get_slide_json(len(controller.slides) - 1)
+    data = json.loads(body)['data']
+    assert slide['data_size'] == len(json.dumps(data).encode())
+    if chart_type == 'pie':
+        assert data[-1] == {'name': 'pie49', 'value': 49}
+    else:
+        assert data['xAxis'][-1] == f'{chart_type}49' and data['series'][-1] == 49
+
+    controller.goto_slide(len(controller.slides) - 1)
+    assert json.loads(controller.snapshot.slide_json)['data'] == data
+
+CSV = b'day,visits\n' + b''.join(b'd%d,%d\n' % (i, i) for i in range(200))
+
+def start_chunked(client, size, **fields):
+    response = client.post('/api/upload/chunked', json=dict({'filename': 'visits.csv', 'size': size, 'chart_type': 'line'}, **fields))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['upload_id']
+
+def put_chunk(client, upload_id, offset, body):
+    return client.put(f'/api/upload/chunked/{upload_id}?offset={offset}', data=body)
+
+def test_chunk_at_the_wrong_offset_is_refused_with_409(admin_client):
+    client = admin_client()
+    upload_id = start_chunked(client, len(CSV))
+    assert put_chunk(client, upload_id, 0, CSV[:100]).get_json()['received'] == 100
+
+    # A gap would corrupt the file; the client is told where to continue
+    response = put_chunk(client, upload_id, 150, CSV[150:250])
+    assert response.status_code == 409 and response.get_json()['received'] == 100
+
+    # Finalizing an incomplete upload is refused the same way
+    response = client.post(f'/api/upload/chunked/{upload_id}/finalize')
+    assert response.status_code == 409 and response.get_json()['received'] == 100
+
+def test_chunked_upload_resumes_after_a_partial_transfer(admin_client, app_module):
+    client = admin_client()
+    upload_id = start_chunked(client, len(CSV))
+    assert put_chunk(client, upload_id, 0, CSV[:64]).status_code == 200
+
+    # A reloaded page asks where to resume; a retried chunk may overlap what is stored
+    resumed = admin_client()
+    assert resumed.get(f'/api/upload/chunked/{upload_id}').get_json()['received'] == 64
+    assert put_chunk(resumed, upload_id, 32, CSV[32:1000]).get_json()['received'] == 1000
+    assert put_chunk(resumed, upload_id, 1000, CSV[1000:]).get_json()['received'] == len(CSV)
+
+    response = resumed.post(f'/api/upload/chunked/{upload_id}/finalize')
+    assert response.status_code == 202, response.get_json()
+    job = wait_for_job(app_module.upload_jobs, response.get_json()['job_id'])
+    assert job['status'] == 'done', job
+    assert app_module.slide_controller.slides[-1]['dataset'] == job['dataset']
+
+def test_chunked_upload_size_limits(admin_client, app_module, monkeypatch):
+    client = admin_client()
+    monkeypatch.setattr(app_module.chunked_uploads, 'max_bytes', 1000)
+    response = client.post('/api/upload/chunked', json={'filename': 'big.csv', 'size': 1001})
+    assert response.status_code == 413
+
+    upload_id = start_chunked(client, 1000)
+    monkeypatch.setattr(app_module.chunked_uploads, 'chunk_size', 100)
+    assert put_chunk(client, upload_id, 0, b'x' * 101).status_code == 400  # Larger than a chunk
+    assert put_chunk(client, upload_id, 0, b'x' * 100).status_code == 200
+    assert client.get(f'/api/upload/chunked/{upload_id}').get_json()['received'] == 100
+
+def test_chunks_assemble_into_the_uploaded_file(tmp_path):
+    import io
+    import pandas as pd
+    from uploads import ChunkedUploads, read_frames
+    uploads = ChunkedUploads(str(tmp_path / 'chunked'), chunk_size=256)
+    upload_id = uploads.start(filename='visits.csv', size=len(CSV))['upload_id']
+    for offset in range(0, len(CSV), 256):
+        chunk = CSV[offset:offset + 256]
+        uploads.write(upload_id, offset, io.BytesIO(chunk), len(chunk))
+
+    filepath, upload = uploads.finish(upload_id, str(tmp_path))
+    assert upload['filename'] == 'visits.csv'
+    frame = pd.concat(read_frames(filepath, 'line'))
+    assert list(frame.columns) == ['day', 'visits']
+    assert frame['day'].tolist()[-1] == 'd199' and frame['visits'].sum() == sum(range(200))
+    assert list((tmp_path / 'chunked').iterdir()) == []  # Part file moved, description removed
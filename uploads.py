@@ -0,0 +1,381 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import json
+import os
+import time
+import uuid
+import logging
+import numpy as np
+import pandas as pd
+from lod import build_lod
+from datasets import DatasetStore
+
+logger = logging.getLogger(__name__)
+
+class UploadQueueFull(Exception):
+    """Raised when more uploads are waiting than the queue depth allows"""
+
+CSV_CHUNK_ROWS = 200000  # Rows parsed at a time, so a large CSV file is never parsed whole
+
+def read_frames(filepath, chart_type):
+    """The upload as DataFrames: CSV in chunks of CSV_CHUNK_ROWS rows, other formats whole"""
+    if filepath.endswith('.csv'):
+        columns = pd.read_csv(filepath, nrows=0).columns
+        options = {}
+        if chart_type in ('line', 'bar', 'pie', 'scatter'):
+            # Charts only use the first two columns
+            options['usecols'] = list(range(min(2, len(columns))))
+        if chart_type in ('line', 'bar', 'pie') and len(columns):
+            # Labels as written, and the same type in every chunk
+            options['dtype'] = {columns[0]: str}
+        yield from pd.read_csv(filepath, chunksize=CSV_CHUNK_ROWS, **options)
+    elif filepath.endswith(('.xlsx', '.xls')):
+        yield pd.read_excel(filepath)
+    elif filepath.endswith('.json'):
+        with open(filepath, 'r') as f:
+            json_data = json.load(f)
+        yield pd.DataFrame(json_data)
+    else:
+        raise ValueError("Unsupported file format")
+
+def numeric_column(column):
+    """Coerce a column to a float64 array, turning unparseable cells into NaN"""
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype='float64')
+
+def concat_numeric(parts, name):
+    """Join a numeric column read in chunks, failing if it has no numeric values at all"""
+    values = np.concatenate(parts) if parts else np.empty(0)
+    if len(values) and np.isnan(values).all():
+        raise ValueError(f"Column '{name}' has no numeric values")
+    return values
+
+def process_uploaded_data(filepath, chart_type):
+    """Process uploaded data file and format for charts.
+
+    Line, bar and scatter data come back as NumPy arrays (float64 with NaN for missing
+    values, labels as fixed-width strings), which build_lod and DatasetStore.save take as
+    they are; a large upload is never turned into Python objects per row.
+    """
+    try:
+        frames = read_frames(filepath, chart_type)
+
+        # Format data based on chart type (whole-column operations per chunk; no per-row Python)
+        if chart_type in ['line', 'bar']:
+            labels, series, rows, name = [], [], 0, None
+            for df in frames:
+                if len(df.columns) >= 2:
+                    # Assume first column is x-axis, second is y-axis
+                    labels.append(df.iloc[:, 0].astype(str).to_numpy(dtype=str))
+                    values = df.iloc[:, 1]
+                else:
+                    values = df.iloc[:, 0]
+                series.append(numeric_column(values))
+                rows += len(df)
+                name = values.name
+            # Chunks are joined once at the end; a single column uses the row number as x-axis
+            x_axis = np.concatenate(labels) if labels else np.arange(rows)
+            return {'xAxis': x_axis, 'series': concat_numeric(series, name)}
+
+        elif chart_type == 'pie':
+            names, values, counts, name = [], [], None, None
+            for df in frames:
+                if len(df.columns) >= 2:
+                    # For pie charts, assume name and value columns
+                    names.append(df.iloc[:, 0].astype(str).to_numpy(dtype=str))
+                    values.append(numeric_column(df.iloc[:, 1]))
+                    name = df.columns[1]
+                else:
+                    # Single column, count occurrences
+                    chunk_counts = df.iloc[:, 0].dropna().astype(str).value_counts()
+                    counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+
+            if counts is not None:
+                counts = counts.sort_values(ascending=False, kind='stable')
+                pie = pd.DataFrame({
+                    'name': counts.index.astype(str),
+                    'value': counts.to_numpy(dtype='int64')
+                })
+                return pie.to_dict('records')
+
+            values = concat_numeric(values, name)
+            keep = ~np.isnan(values)  # A slice without a value cannot be drawn
+            pie = pd.DataFrame({
+                'name': np.concatenate(names)[keep] if names else [],
+                'value': values[keep]
+            })
+            return pie.to_dict('records')
+
+        elif chart_type == 'scatter':
+            # Assume two numeric columns
+            x, y, columns = [], [], None
+            for df in frames:
+                if len(df.columns) < 2:
+                    raise ValueError("Scatter plot requires at least 2 columns")
+                x.append(numeric_column(df.iloc[:, 0]))
+                y.append(numeric_column(df.iloc[:, 1]))
+                columns = df.columns
+            if columns is None:
+                return np.empty((0, 2))
+
+            points = np.column_stack([concat_numeric(x, columns[0]), concat_numeric(y, columns[1])])
+            # Points missing either coordinate cannot be plotted
+            return points[~np.isnan(points).any(axis=1)]
+
+        else:
+            # Default format for other chart types
+            return pd.concat(frames).to_dict('records')
+
+    except Exception as e:
+        logger.error("Error processing data: %s", e)
+        raise e
+
+def run_upload_job(filepath, chart_type, store_root):
+    """Parse and transform a saved upload into the dataset store (runs in a pool process).
+
+    Returns (dataset key, deduplicated): an upload identical to an earlier one reuses its
+    dataset without being processed again.
+    """
+    try:
+        store = DatasetStore(store_root)
+        key = store.digest(filepath, chart_type)
+        if store.has(key):
+            return key, True
+
+        data = process_uploaded_data(filepath, chart_type)
+
+        # Large line/scatter datasets get downsampled levels; the slide embeds a screen-sized one
+        _, lod = build_lod(chart_type, data)
+        store.save(key, chart_type, data, lod)
+        return key, False
+    finally:
+        os.remove(filepath)
+
+class UploadJobs:
+    """Uploads parsed and transformed in a process pool, with their status kept for polling.
+
+    Jobs live in the process that accepted the upload, so with several gunicorn workers
+    a status request must reach the same worker (or be retried).
+    """
+
+    def __init__(self, store, pool_size=2, queue_depth=8, retention=3600):
+        self.store = store  # DatasetStore the processed data is written to
+        self.pool_size = pool_size
+        self.queue_depth = queue_depth  # Most jobs queued or processing at once
+        self.retention = retention  # Seconds finished jobs stay queryable
+        self.jobs = {}  # job id -> job dict
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def _ensure_pool(self):
+        """Start the pool on first use. Spawned, not forked: this process runs threads"""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+    def submit(self, controller, filepath, chart_type, slide):
+        """Queue a saved upload; `slide` is the new slide minus its data. Returns the job id.
+
+        Hashing the file for deduplication happens in the pool too, not in the request.
+        """
+        with self.lock:
+            self._prune()
+            active = sum(1 for job in self.jobs.values() if job['status'] in ('queued', 'adding'))
+            if active >= self.queue_depth:
+                raise UploadQueueFull(f"{active} uploads are already being processed, try again shortly")
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'status': 'queued',
+                'slide_id': slide['id'],
+                'title': slide['title'],
+                'dataset': None,  # Known once the pool has hashed the file
+                'deduplicated': False,
+                'error': None,
+                'created_at': time.time(),
+                'finished_at': None
+            }
+            self._ensure_pool()
+            job['future'] = self.pool.submit(run_upload_job, filepath, chart_type, self.store.root)
+            self.jobs[job['id']] = job
+
+        job['future'].add_done_callback(lambda future: self._processed(job, future, controller, slide, filepath))
+        logger.info("📥 Queued upload job %s for slide %s", job['id'], slide['id'])
+        return job['id']
+
+    def _processed(self, job, future, controller, slide, filepath):
+        """Hand a processed upload to the slide writer"""
+        try:
+            job['dataset'], job['deduplicated'] = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                with self.lock:
+                    self.pool = None  # Start a fresh pool for the next upload
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            logger.error("Error processing upload job %s: %s", job['id'], e)
+            self._finish(job, str(e))
+            return
+
+        if job['deduplicated']:
+            logger.info("📥 Upload for slide %s reuses dataset %s", slide['id'], job['dataset'][:12])
+        self._add(job, controller, slide)
+
+    def _add(self, job, controller, slide):
+        """Have the slide writer add the slide, with its data read back from the store"""
+        try:
+            slide = self.store.attach(slide, job['dataset'])
+        except Exception as e:
+            logger.error("Error loading dataset for upload job %s: %s", job['id'], e)
+            self._finish(job, str(e))
+            return
+
+        job['status'] = 'adding'
+        controller.submit('add_slide', slide).add_done_callback(
+            lambda added: self._finish(job, str(added.exception()) if added.exception() else None)
+        )
+
+    def _finish(self, job, error=None):
+        job['error'] = error
+        job['status'] = 'error' if error else 'done'
+        job['finished_at'] = time.time()
+
+    def _prune(self):
+        """Forget finished jobs past their retention (caller holds the lock)"""
+        cutoff = time.time() - self.retention
+        for job_id in [i for i, job in self.jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self.jobs[job_id]
+
+    def status(self, job_id):
+        """Public view of a job, or None if unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            view = {key: value for key, value in job.items() if key != 'future'}
+
+        # queued -> processing (in a pool process) -> adding (to the deck) -> done | error
+        if view['status'] == 'queued' and job['future'].running():
+            view['status'] = 'processing'
+        return view
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'pool_size': self.pool_size, 'queue_depth': self.queue_depth, 'jobs': counts}
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a chunk does not start where the stored part of the upload ends"""
+
+    def __init__(self, received):
+        super().__init__(f"Upload has {received} bytes; send the next chunk from there")
+        self.received = received
+
+class ChunkedUploads:
+    """Files sent in chunks (init, PUT each chunk at its offset, finalize), for uploads
+    larger than one request may be.
+
+    Each upload is a .part file plus a .json description under `root`. The part file's
+    size is the resume point, so an interrupted transfer continues from the last byte
+    written, from any worker sharing the directory.
+    """
+
+    def __init__(self, root, chunk_size=8 * 1024 * 1024, max_bytes=1024 * 1024 * 1024, expiry=86400):
+        self.root = root
+        self.chunk_size = chunk_size  # Largest chunk accepted in one request
+        self.max_bytes = max_bytes  # Largest file accepted
+        self.expiry = expiry  # Seconds an unfinished upload is kept after its last chunk
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, upload_id, extension):
+        # Ids are generated here; anything else could name a path outside root
+        if len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, f"{upload_id}.{extension}")
+
+    def start(self, **upload):
+        """Register an upload of upload['size'] bytes. Returns its status"""
+        self.prune()
+        if upload['size'] > self.max_bytes:
+            raise ValueError(f"Files larger than {self.max_bytes} bytes are not accepted")
+
+        upload_id = uuid.uuid4().hex
+        open(self._path(upload_id, 'part'), 'wb').close()
+        with open(self._path(upload_id, 'json'), 'w') as f:
+            json.dump(upload, f)
+        logger.info("📦 Started chunked upload %s (%s bytes)", upload_id, upload['size'])
+        return self.status(upload_id)
+
+    def describe(self, upload_id):
+        """What was given to start(); KeyError if the upload is unknown"""
+        try:
+            with open(self._path(upload_id, 'json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def status(self, upload_id):
+        upload = self.describe(upload_id)
+        return {
+            'upload_id': upload_id,
+            'size': upload['size'],
+            'received': os.path.getsize(self._path(upload_id, 'part')),
+            'chunk_size': self.chunk_size
+        }
+
+    def write(self, upload_id, offset, stream, length):
+        """Write one chunk at offset, streaming it to disk. Returns the bytes received so far.
+
+        A chunk may overlap what is already stored (a retried chunk), but not leave a gap.
+        """
+        upload = self.describe(upload_id)
+        path = self._path(upload_id, 'part')
+        received = os.path.getsize(path)
+        if offset > received:
+            raise UploadOffsetMismatch(received)
+        if length > self.chunk_size or offset + length > upload['size']:
+            raise ValueError(f"Chunk must be at most {self.chunk_size} bytes and end within the file")
+
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            remaining = length
+            while remaining:
+                block = stream.read(min(remaining, 64 * 1024))
+                if not block:
+                    break  # Client went away; the part written so far counts
+                f.write(block)
+                remaining -= len(block)
+        return os.path.getsize(path)
+
+    def finish(self, upload_id, folder):
+        """Move a complete upload into folder. Returns (filepath, description)"""
+        upload = self.describe(upload_id)
+        received = os.path.getsize(self._path(upload_id, 'part'))
+        if received != upload['size']:
+            raise UploadOffsetMismatch(received)
+
+        filepath = os.path.join(folder, f"{upload_id}_{upload['filename']}")
+        os.rename(self._path(upload_id, 'part'), filepath)
+        os.remove(self._path(upload_id, 'json'))
+        logger.info("📦 Finished chunked upload %s", upload_id)
+        return filepath, upload
+
+    def prune(self):
+        """Delete unfinished uploads nobody has written to for `expiry` seconds"""
+        cutoff = time.time() - self.expiry
+        for name in os.listdir(self.root):
+            if not name.endswith('.part'):
+                continue
+            upload_id = name[:-len('.part')]
+            try:
+                if os.path.getmtime(self._path(upload_id, 'part')) < cutoff:
+                    os.remove(self._path(upload_id, 'part'))
+                    os.remove(self._path(upload_id, 'json'))
+                    logger.info("📦 Dropped abandoned chunked upload %s", upload_id)
+            except (KeyError, FileNotFoundError):
+                pass